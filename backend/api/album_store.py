@@ -0,0 +1,563 @@
+"""
+Austauschbare Album-Speicher: JSON-Dateien (wie bisher) oder SQLite im WAL-Modus.
+
+Ein Album sieht nach außen immer gleich aus:
+    {"album_name": ..., "cards": [{"card_id", "set", "count_normal", "count_reverse"}, ...], ...}
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from helper import ALBUM_PATH, album_lock, load_album, save_album, write_json_atomic
+
+ALBUM_BACKEND = os.environ.get("ALBUM_BACKEND", "sqlite")  # "sqlite", "json" oder "journal"
+ALBUM_DB_PATH = os.environ.get("ALBUM_DB_PATH", os.path.join(ALBUM_PATH, "albums.sqlite3"))
+
+# Journal-Modus
+JOURNAL_FSYNC = os.environ.get("ALBUM_JOURNAL_FSYNC", "interval")  # "always", "interval" oder "never"
+JOURNAL_FSYNC_INTERVAL = 1.0       # Sekunden zwischen gesammelten fsyncs
+JOURNAL_COMPACT_INTERVAL = 30.0    # spätestens so oft wird das Journal in den Snapshot gefaltet
+JOURNAL_COMPACT_THRESHOLD = 1000   # ab so vielen Einträgen sofort kompaktieren
+
+SQLITE_LOOKUP_CHUNK = 500  # Platzhalter pro IN (...), ältere SQLite-Versionen erlauben höchstens 999
+
+
+def card_set_of(card_id):
+    return card_id.split("-")[0] if "-" in card_id else "Unknown"
+
+
+class AlbumStore:
+    """Schnittstelle für Album-Speicher."""
+
+    def load(self, album_name):
+        """Album als Dict oder None, wenn es nicht existiert."""
+        raise NotImplementedError
+
+    def save(self, album_name, album):
+        """Ersetzt das komplette Album (Anlegen/Überschreiben)."""
+        raise NotImplementedError
+
+    def version(self, album_name):
+        """Token, das sich bei jeder Änderung des Albums ändert; None, wenn es das Album nicht gibt."""
+        raise NotImplementedError
+
+    def add_cards_versioned(self, album_name, items):
+        """
+        Fügt Karten hinzu, legt das Album bei Bedarf an. `items` sind (card_id, count_normal, count_reverse),
+        doppelte card_ids werden vorher zusammengefasst. Liefert ({card_id: neuer Eintrag}, Version
+        vorher, Version nachher), beide Versionen werden atomar mit dem Schreiben ermittelt.
+        """
+        raise NotImplementedError
+
+    def add_cards(self, album_name, items):
+        return self.add_cards_versioned(album_name, items)[0]
+
+    def add_card(self, album_name, card_id, count_normal=1, count_reverse=0):
+        """Erhöht die Zähler einer Karte. Liefert den neuen Eintrag."""
+        return self.add_cards(album_name, [(card_id, count_normal, count_reverse)])[card_id]
+
+    def list_albums(self):
+        raise NotImplementedError
+
+
+def aggregate_items(items):
+    """Fasst (card_id, normal, reverse) pro card_id zusammen, Reihenfolge des ersten Auftretens bleibt."""
+    totals = {}
+    for card_id, normal, reverse in items:
+        prev_normal, prev_reverse = totals.get(card_id, (0, 0))
+        totals[card_id] = (prev_normal + normal, prev_reverse + reverse)
+    return totals
+
+
+class JsonAlbumStore(AlbumStore):
+    """Ein JSON-Dokument pro Album unter ALBUM_PATH (bisheriges Verhalten)."""
+
+    def __init__(self, path=ALBUM_PATH):
+        self.path = path
+
+    def load(self, album_name):
+        return load_album(album_name, self.path)
+
+    def save(self, album_name, album):
+        with album_lock(album_name, self.path):
+            save_album(album_name, album, self.path)
+
+    def version(self, album_name):
+        # Jedes Speichern ersetzt die Datei (neue Inode, neue mtime)
+        try:
+            st = os.stat(os.path.join(self.path, f"{album_name}.json"))
+        except FileNotFoundError:
+            return None
+        return f"{st.st_ino}-{st.st_size}-{st.st_mtime_ns}"
+
+    def add_cards_versioned(self, album_name, items):
+        # Read-modify-write unter der Album-Sperre, sonst überschreiben sich parallele Worker
+        with album_lock(album_name, self.path):
+            before = self.version(album_name)
+            entries = self._add_cards(album_name, items)
+            return entries, before, self.version(album_name)
+
+    def _add_cards(self, album_name, items):
+        # Ein Laden, ein Speichern für den ganzen Stapel
+        album = load_album(album_name, self.path)
+        if album is None:
+            album = {"album_name": album_name, "cards": []}
+        if "cards" not in album:
+            album["cards"] = []
+
+        by_id = {}
+        for card in album["cards"]:
+            by_id.setdefault(card["card_id"], card)
+        result = {}
+        for card_id, (normal, reverse) in aggregate_items(items).items():
+            # Suche, ob Karte schon existiert (via card_id)
+            existing = by_id.get(card_id)
+            if existing:
+                existing["count_normal"] = existing.get("count_normal", 0) + normal
+                existing["count_reverse"] = existing.get("count_reverse", 0) + reverse
+            else:
+                existing = by_id[card_id] = {
+                    "card_id": card_id,
+                    "set": card_set_of(card_id),
+                    "count_normal": normal,
+                    "count_reverse": reverse,
+                }
+                album["cards"].append(existing)
+            result[card_id] = dict(existing)
+
+        save_album(album_name, album, self.path)
+        return result
+
+    def list_albums(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(f[:-len(".json")] for f in os.listdir(self.path) if f.endswith(".json"))
+
+
+class SqliteAlbumStore(AlbumStore):
+    """
+    Alle Alben in einer SQLite-Datenbank (WAL). Eine Karte hinzufügen ist ein einzelner Upsert,
+    gleichzeitige Requests verlieren dadurch keine Updates mehr.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS albums (
+            name TEXT PRIMARY KEY,
+            meta TEXT NOT NULL DEFAULT '{}',
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS album_cards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            album TEXT NOT NULL REFERENCES albums(name) ON DELETE CASCADE,
+            card_id TEXT NOT NULL,
+            card_set TEXT,
+            count_normal INTEGER NOT NULL DEFAULT 0,
+            count_reverse INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (album, card_id)
+        );
+    """
+
+    def __init__(self, db_path=ALBUM_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.created = not os.path.exists(db_path)
+        conn = self._conn()
+        conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(albums)")}
+        if "version" not in columns:
+            # Datenbanken von vor der Versionsspalte
+            conn.execute("ALTER TABLE albums ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def _conn(self):
+        # Eine Verbindung pro Thread, Flask bedient Requests parallel
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._conn())
+
+    def load(self, album_name):
+        conn = self._conn()
+        row = conn.execute("SELECT meta FROM albums WHERE name = ?", (album_name,)).fetchone()
+        if row is None:
+            return None
+        cards = conn.execute(
+            "SELECT card_id, card_set, count_normal, count_reverse FROM album_cards "
+            "WHERE album = ? ORDER BY id", (album_name,)
+        ).fetchall()
+        return {
+            **json.loads(row[0]),
+            "album_name": album_name,
+            "cards": [
+                {"card_id": card_id, "set": card_set, "count_normal": normal, "count_reverse": reverse}
+                for card_id, card_set, normal, reverse in cards
+            ],
+        }
+
+    def save(self, album_name, album):
+        meta = {k: v for k, v in album.items() if k not in ("album_name", "cards")}
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO albums (name, meta, version) VALUES (?, ?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET meta = excluded.meta, version = version + 1",
+                (album_name, json.dumps(meta, ensure_ascii=False)),
+            )
+            conn.execute("DELETE FROM album_cards WHERE album = ?", (album_name,))
+            conn.executemany(
+                "INSERT INTO album_cards (album, card_id, card_set, count_normal, count_reverse) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (album, card_id) DO UPDATE SET "
+                "count_normal = count_normal + excluded.count_normal, "
+                "count_reverse = count_reverse + excluded.count_reverse",
+                [
+                    (album_name, c["card_id"], c.get("set"), c.get("count_normal", 0), c.get("count_reverse", 0))
+                    for c in album.get("cards") or []
+                ],
+            )
+
+    def version(self, album_name):
+        row = self._conn().execute("SELECT version FROM albums WHERE name = ?", (album_name,)).fetchone()
+        return row[0] if row else None
+
+    def add_cards_versioned(self, album_name, items):
+        # Eine Transaktion für den ganzen Stapel, ein Upsert pro Karte
+        totals = aggregate_items(items)
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO albums (name) VALUES (?) ON CONFLICT (name) DO NOTHING", (album_name,))
+            (before,) = conn.execute("SELECT version FROM albums WHERE name = ?", (album_name,)).fetchone()
+            conn.executemany(
+                "INSERT INTO album_cards (album, card_id, card_set, count_normal, count_reverse) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (album, card_id) DO UPDATE SET "
+                "count_normal = count_normal + excluded.count_normal, "
+                "count_reverse = count_reverse + excluded.count_reverse",
+                [(album_name, card_id, card_set_of(card_id), normal, reverse)
+                 for card_id, (normal, reverse) in totals.items()],
+            )
+            conn.execute("UPDATE albums SET version = version + 1 WHERE name = ?", (album_name,))
+            # Nur die Zeilen des Stapels zurücklesen, nicht das ganze Album
+            card_ids = list(totals)
+            rows = []
+            for start in range(0, len(card_ids), SQLITE_LOOKUP_CHUNK):
+                chunk = card_ids[start:start + SQLITE_LOOKUP_CHUNK]
+                rows += conn.execute(
+                    "SELECT card_id, card_set, count_normal, count_reverse FROM album_cards "
+                    f"WHERE album = ? AND card_id IN ({', '.join('?' * len(chunk))})",
+                    (album_name, *chunk),
+                ).fetchall()
+        entries = {
+            card_id: {"card_id": card_id, "set": card_set, "count_normal": normal, "count_reverse": reverse}
+            for card_id, card_set, normal, reverse in rows
+        }
+        return entries, before, before + 1
+
+    def list_albums(self):
+        return [name for (name,) in self._conn().execute("SELECT name FROM albums ORDER BY name")]
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK für Verbindungen im Autocommit-Modus."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class _JournaledAlbum:
+    """Materialisierte Sicht eines Albums plus Stand des Journals, den diese Sicht enthält."""
+
+    def __init__(self, album_name):
+        self.album_name = album_name
+        self.lock = threading.Lock()
+        self.journal = None          # offenes Journal im Append-Modus
+        self.dirty = False           # geschrieben, aber noch nicht gefsynct
+        self.last_compact = time.monotonic()
+        self.reset({"album_name": album_name, "cards": []}, 0, None)
+        self.loaded = False          # erst beim ersten Zugriff von der Platte lesen
+
+    def reset(self, album, seq, snapshot_stat):
+        album.setdefault("cards", [])
+        self.album = album
+        self.by_id = {}
+        for card in album["cards"]:
+            self.by_id.setdefault(card["card_id"], card)
+        self.seq = seq               # letzte angewandte Journal-Sequenz
+        self.compacted_seq = seq     # Sequenz, die im Snapshot steckt
+        self.snapshot_stat = snapshot_stat
+        self.journal_offset = 0      # bis hierhin ist das Journal in der Sicht enthalten
+        self.loaded = True
+
+    @property
+    def exists(self):
+        return self.snapshot_stat is not None or self.seq > 0
+
+    def apply(self, card_id, normal, reverse):
+        existing = self.by_id.get(card_id)
+        if existing:
+            existing["count_normal"] = existing.get("count_normal", 0) + normal
+            existing["count_reverse"] = existing.get("count_reverse", 0) + reverse
+        else:
+            existing = self.by_id[card_id] = {
+                "card_id": card_id,
+                "set": card_set_of(card_id),
+                "count_normal": normal,
+                "count_reverse": reverse,
+            }
+            self.album["cards"].append(existing)
+        return existing
+
+
+def _file_stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class JournalAlbumStore(AlbumStore):
+    """
+    Albumänderungen als Append-only-Journal: jede Erhöhung ist eine kleine JSON-Zeile in
+    `<album>.journal`, gelesen wird aus einer Sicht im Speicher. Ein Hintergrund-Thread faltet
+    das Journal regelmäßig in den Snapshot `<album>.json` (gleiches Format wie JsonAlbumStore).
+
+    Nach einem Absturz wird beim Laden der Snapshot gelesen und das Journal ab der im Snapshot
+    vermerkten Sequenz (`_journal_seq`) erneut angewandt. fsync-Strategie über `fsync`:
+    "always" (nach jeder Zeile), "interval" (gesammelt durch den Hintergrund-Thread) oder "never".
+
+    Jeder Zugriff hält die Album-Sperre und liest vorher nach, was andere Worker-Prozesse
+    ins Journal geschrieben oder kompaktiert haben.
+    """
+
+    FSYNC_POLICIES = ("always", "interval", "never")
+
+    def __init__(self, path=ALBUM_PATH, fsync=JOURNAL_FSYNC, fsync_interval=JOURNAL_FSYNC_INTERVAL,
+                 compact_interval=JOURNAL_COMPACT_INTERVAL, compact_threshold=JOURNAL_COMPACT_THRESHOLD):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unbekannte fsync-Strategie: {fsync}")
+        self.path = path
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.compact_interval = compact_interval
+        self.compact_threshold = compact_threshold
+        self._albums = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._compactor = None
+        os.makedirs(path, exist_ok=True)
+
+    def _snapshot_path(self, album_name):
+        return os.path.join(self.path, f"{album_name}.json")
+
+    def _journal_path(self, album_name):
+        return os.path.join(self.path, f"{album_name}.journal")
+
+    @contextmanager
+    def _locked(self, album_name):
+        """Thread- und Prozess-Sperre für ein Album; liefert die aktualisierte Sicht."""
+        with self._lock:
+            entry = self._albums.get(album_name)
+            if entry is None:
+                entry = self._albums[album_name] = _JournaledAlbum(album_name)
+        with entry.lock, album_lock(album_name, self.path):
+            self._refresh(entry)
+            yield entry
+
+    def _refresh(self, entry):
+        """Snapshot neu laden, falls ihn jemand ersetzt hat, und neue Journal-Zeilen nachspielen."""
+        snapshot_path = self._snapshot_path(entry.album_name)
+        snapshot_stat = _file_stat(snapshot_path)
+        recovering = not entry.loaded
+        if recovering or snapshot_stat != entry.snapshot_stat:
+            album = {"album_name": entry.album_name, "cards": []}
+            if snapshot_stat is not None:
+                with open(snapshot_path, "r", encoding="utf-8") as f:
+                    album = json.load(f)
+            entry.reset(album, album.pop("_journal_seq", 0), snapshot_stat)
+
+        journal_path = self._journal_path(entry.album_name)
+        journal_stat = _file_stat(journal_path)
+        if journal_stat is None or journal_stat[1] == entry.journal_offset:
+            return
+        if journal_stat[1] < entry.journal_offset:
+            # Journal wurde ohne neuen Snapshot geleert: Sicht ist nicht mehr sicher, komplett neu lesen
+            entry.loaded = False
+            return self._refresh(entry)
+
+        replayed = 0
+        with open(journal_path, "r+b") as f:
+            f.seek(entry.journal_offset)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unvollständige Zeile")
+                    record = json.loads(line)
+                except ValueError:
+                    # Abgebrochene Zeile nach einem Absturz: abschneiden, sonst hängen neue Zeilen daran
+                    f.truncate(entry.journal_offset)
+                    print(f"Album {entry.album_name}: beschädigtes Journal-Ende abgeschnitten")
+                    break
+                if record["seq"] > entry.seq:
+                    for card_id, normal, reverse in record["items"]:
+                        entry.apply(card_id, normal, reverse)
+                    entry.seq = record["seq"]
+                    replayed += 1
+                entry.journal_offset += len(line)
+        if replayed and recovering:
+            print(f"Album {entry.album_name}: {replayed} Journal-Einträge nachgespielt")
+
+    def _append(self, entry, items):
+        entry.seq += 1
+        line = json.dumps({"seq": entry.seq, "items": items}, ensure_ascii=False).encode("utf-8") + b"\n"
+        if entry.journal is None:
+            entry.journal = open(self._journal_path(entry.album_name), "ab")
+        entry.journal.write(line)
+        entry.journal.flush()
+        entry.journal_offset += len(line)
+        if self.fsync == "always":
+            os.fsync(entry.journal.fileno())
+        elif self.fsync == "interval":
+            entry.dirty = True
+        if entry.seq - entry.compacted_seq >= self.compact_threshold:
+            self._wakeup.set()
+
+    def load(self, album_name):
+        with self._locked(album_name) as entry:
+            if not entry.exists:
+                return None
+            return {**entry.album, "cards": [dict(card) for card in entry.album["cards"]]}
+
+    def save(self, album_name, album):
+        with self._locked(album_name) as entry:
+            cards = [dict(card) for card in album.get("cards") or []]
+            entry.album = {**album, "album_name": album_name, "cards": cards}
+            entry.by_id = {}
+            for card in cards:
+                entry.by_id.setdefault(card["card_id"], card)
+            # Komplettes Ersetzen ist selten: direkt in den Snapshot, das Journal ist damit erledigt.
+            # Die Sequenz zählt trotzdem hoch, damit sich die Albumversion ändert.
+            entry.seq += 1
+            self._compact(entry)
+
+    def version(self, album_name):
+        with self._locked(album_name) as entry:
+            return entry.seq if entry.exists else None
+
+    def add_cards_versioned(self, album_name, items):
+        totals = aggregate_items(items)
+        with self._locked(album_name) as entry:
+            before = entry.seq if entry.exists else None
+            # Ein Stapel ist eine Journal-Zeile und damit atomar
+            self._append(entry, [[card_id, n, r] for card_id, (n, r) in totals.items()])
+            entries = {card_id: dict(entry.apply(card_id, n, r)) for card_id, (n, r) in totals.items()}
+            return entries, before, entry.seq
+
+    def list_albums(self):
+        names = {f.rsplit(".", 1)[0] for f in os.listdir(self.path) if f.endswith((".json", ".journal"))}
+        return sorted(names)
+
+    def _compact(self, entry):
+        """Schreibt die Sicht atomar als Snapshot und leert das Journal. Aufruf innerhalb von _locked."""
+        snapshot_path = self._snapshot_path(entry.album_name)
+        write_json_atomic(snapshot_path, {**entry.album, "_journal_seq": entry.seq})
+        # Ein Absturz genau hier ist harmlos: _journal_seq im Snapshot überspringt die alten Zeilen
+        with open(self._journal_path(entry.album_name), "ab") as f:
+            f.truncate(0)
+        entry.snapshot_stat = _file_stat(snapshot_path)
+        entry.journal_offset = 0
+        entry.compacted_seq = entry.seq
+        entry.dirty = False
+        entry.last_compact = time.monotonic()
+
+    def sync(self, compact_all=False):
+        """fsync für offene Journale; kompaktiert Alben mit genug oder zu alten Einträgen."""
+        now = time.monotonic()
+        with self._lock:
+            albums = list(self._albums)
+        for album_name in albums:
+            entry = self._albums[album_name]
+            if not entry.dirty and entry.seq == entry.compacted_seq and not compact_all:
+                continue
+            with self._locked(album_name) as entry:
+                pending = entry.seq - entry.compacted_seq
+                due = now - entry.last_compact >= self.compact_interval
+                if pending and (compact_all or pending >= self.compact_threshold or due):
+                    self._compact(entry)
+                elif entry.dirty and entry.journal is not None:
+                    os.fsync(entry.journal.fileno())
+                    entry.dirty = False
+
+    def start(self):
+        """Startet den Hintergrund-Thread für fsync und Kompaktierung."""
+        if self._compactor is not None:
+            return self
+
+        def run():
+            while not self._stopped:
+                self._wakeup.wait(self.fsync_interval)
+                self._wakeup.clear()
+                try:
+                    self.sync()
+                except Exception as e:
+                    print(f"Album-Kompaktierung fehlgeschlagen: {e}")
+
+        self._compactor = threading.Thread(target=run, name="album-compactor", daemon=True)
+        self._compactor.start()
+        atexit.register(self.close)
+        return self
+
+    def close(self):
+        self._stopped = True
+        self._wakeup.set()
+        self.sync(compact_all=True)
+
+
+def migrate_json_albums(target, source=None, overwrite=False):
+    """Kopiert alle JSON-Alben nach `target`. Bestehende Alben werden nur mit overwrite=True ersetzt."""
+    source = source or JsonAlbumStore()
+    existing = set(target.list_albums())
+    migrated = []
+    for album_name in source.list_albums():
+        if album_name in existing and not overwrite:
+            continue
+        album = source.load(album_name)
+        if album is None:
+            continue
+        target.save(album_name, album)
+        migrated.append(album_name)
+    return migrated
+
+
+def create_album_store(backend=ALBUM_BACKEND):
+    if backend == "json":
+        return JsonAlbumStore()
+    if backend == "journal":
+        return JournalAlbumStore().start()
+    if backend == "sqlite":
+        store = SqliteAlbumStore()
+        if store.created:
+            # Neue Datenbank: vorhandene JSON-Alben einmalig übernehmen
+            migrated = migrate_json_albums(store)
+            if migrated:
+                print(f"JSON-Alben nach SQLite übernommen: {', '.join(migrated)}")
+        return store
+    raise ValueError(f"Unbekanntes Album-Backend: {backend}")
@@ -0,0 +1,197 @@
+import base64
+import bisect
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from album_store import card_set_of
+
+PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+_NUMBER_RE = re.compile(r"(\D*)(\d*)(.*)")
+_KEY_TYPES = (str, str, int, str, str)  # Typen der Elemente von sort_key()
+
+
+def sort_key(card):
+    """Sortierung für Seiten: Set, dann Nummer natürlich sortiert ("TG2" < "TG10" < "SWSH001"), dann ID."""
+    prefix, digits, rest = _NUMBER_RE.match(card.get("number") or "").groups()
+    return card_set_of(card["id"]), prefix, int(digits) if digits else -1, rest, card["id"]
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Cursor -> Sortierschlüssel der letzten gelieferten Karte; ValueError bei kaputtem Cursor."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Ungültiger Cursor") from e
+    # Muss mit sort_key vergleichbar sein, sonst wirft bisect einen TypeError
+    if not isinstance(key, list) or len(key) != len(_KEY_TYPES) or \
+            not all(type(part) is kind for part, kind in zip(key, _KEY_TYPES)):
+        raise ValueError("Ungültiger Cursor")
+    return tuple(key)
+
+
+class AlbumView:
+    """
+    Materialisierte Sicht eines Albums: Karten mit Details aus dem Katalog plus laufende Summen.
+
+    Gilt für genau eine Albumversion und eine Katalogversion. Schreibzugriffe werden
+    inkrementell eingearbeitet, statt die Sicht neu aufzubauen.
+    """
+
+    def __init__(self, album, catalog, version):
+        self.catalog = catalog
+        self.version = version
+        self.cards = []          # gemergte Karten in Album-Reihenfolge
+        self._positions = {}     # card_id -> Index in self.cards
+        self.total_cards = 0
+        self.value_low = 0.0
+        self.value_reverse = 0.0
+        self.set_counts = {}
+        self._sorted = None      # (Sortierschlüssel, Positionen), erst bei Bedarf gebaut
+        self.lock = threading.Lock()
+        for entry in album.get("cards") or []:
+            # Doppelte Einträge erscheinen wie bisher mehrfach, Updates treffen den ersten
+            self._insert(entry)
+
+    def _account(self, merged, sign):
+        count = merged["count_normal"] + merged["count_reverse"]
+        self.total_cards += sign * count
+        self.value_low += sign * (merged["priceLow"] or 0) * merged["count_normal"]
+        self.value_reverse += sign * (merged["priceReverse"] or 0) * merged["count_reverse"]
+        card_set = card_set_of(merged["id"])
+        self.set_counts[card_set] = self.set_counts.get(card_set, 0) + sign * count
+        if not self.set_counts[card_set]:
+            del self.set_counts[card_set]
+
+    def apply(self, entries):
+        """Übernimmt Album-Einträge mit ihren neuen Gesamtzählern (wie von AlbumStore geliefert)."""
+        for entry in entries:
+            card_id = entry["card_id"]
+            pos = self._positions.get(card_id)
+            if pos is not None:
+                old = self.cards[pos]
+                self._account(old, -1)
+                # Neues Dict statt Änderung: parallel ausgelieferte Antworten sehen nie halbe Zähler
+                merged = {**old, "count_normal": entry.get("count_normal", 0),
+                          "count_reverse": entry.get("count_reverse", 0)}
+                self.cards[pos] = merged
+                self._account(merged, 1)
+            else:
+                self._insert(entry)
+
+    def _insert(self, entry):
+        card = self.catalog.get(entry["card_id"])
+        if not card:
+            # Unbekannte Karten tauchen wie bisher nicht auf und zählen nicht mit
+            return
+        merged = {
+            **card.to_dict(),  # alle Details (name, image, set, prices, …)
+            "count_normal": entry.get("count_normal", 0),
+            "count_reverse": entry.get("count_reverse", 0),
+        }
+        self._positions.setdefault(card.id, len(self.cards))
+        self.cards.append(merged)
+        self._account(merged, 1)
+        # Neue Karte ändert die Reihenfolge, reine Zähler-Updates nicht
+        self._sorted = None
+
+    def _sorted_index(self):
+        if self._sorted is None:
+            order = sorted((sort_key(card), pos) for pos, card in enumerate(self.cards))
+            self._sorted = ([key for key, _ in order], [pos for _, pos in order])
+        return self._sorted
+
+    def page(self, limit, cursor=None):
+        """
+        Eine Seite nach Set und Nummer sortiert, ab der Karte nach `cursor` (Keyset statt Offset,
+        dadurch stabil, wenn zwischen zwei Seiten Karten dazukommen). Liefert (Karten, nächster Cursor).
+        """
+        with self.lock:
+            keys, positions = self._sorted_index()
+            start = bisect.bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+            end = start + limit
+            cards = [self.cards[pos] for pos in positions[start:end]]
+            next_cursor = encode_cursor(keys[end - 1]) if end < len(keys) else None
+        return cards, next_cursor
+
+    def snapshot(self):
+        """Aktuelle Kartenliste (flache Kopie der Referenzen) für Streaming ohne Sperre."""
+        with self.lock:
+            return list(self.cards)
+
+    def _totals(self):
+        return {
+            "total_cards": self.total_cards,
+            "total_value_low": round(self.value_low, 2),
+            "total_value_reverse": round(self.value_reverse, 2),
+            "set_counts": dict(self.set_counts),
+        }
+
+    def totals(self):
+        with self.lock:
+            return self._totals()
+
+    def payload(self):
+        with self.lock:
+            return {"cards": list(self.cards), **self._totals()}
+
+
+class AlbumViewCache:
+    """
+    Hält AlbumViews pro Album (LRU). Eine Sicht wird verworfen, sobald sich Album- oder
+    Katalogversion ändern, ohne dass der Schreibzugriff über apply_write hereinkam
+    (z.B. durch einen anderen Worker-Prozess oder einen Katalog-Reload).
+    """
+
+    def __init__(self, store, maxsize=64):
+        self.store = store
+        self.maxsize = maxsize
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, album_name, catalog):
+        version = self.store.version(album_name)
+        if version is None:
+            return None
+        with self._lock:
+            view = self._views.get(album_name)
+            if view is not None and view.version == version and view.catalog is catalog:
+                self._views.move_to_end(album_name)
+                return view
+
+        # Version vor dem Laden: kommt dazwischen ein Schreibzugriff, passt die Version beim nächsten Mal
+        # nicht und die Sicht wird neu gebaut
+        album = self.store.load(album_name)
+        if album is None:
+            return None
+        view = AlbumView(album, catalog, version)
+        with self._lock:
+            self._views[album_name] = view
+            self._views.move_to_end(album_name)
+            while len(self._views) > self.maxsize:
+                self._views.popitem(last=False)
+        return view
+
+    def apply_write(self, album_name, entries, version_before, version_after):
+        """Arbeitet einen eigenen Schreibzugriff ein, wenn die Sicht genau den Stand davor kannte."""
+        with self._lock:
+            view = self._views.get(album_name)
+            if view is None:
+                return
+            if view.version != version_before:
+                del self._views[album_name]
+                return
+        with view.lock:
+            view.apply(entries.values())
+            view.version = version_after
+
+    def invalidate(self, album_name):
+        with self._lock:
+            self._views.pop(album_name, None)
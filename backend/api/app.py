@@ -1,23 +1,63 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import os
 import json
-from rapidfuzz import process, fuzz
-from helper import load_set_mapping, load_cards, normalize_card, lookup_card_by_id, load_album, save_album, ALBUM_PATH
 
-# Initialisiere Flask-App
-app = Flask(__name__)
-CORS(app, supports_credentials=True)
-# Setup Sets
-cards = load_cards()
-normalized_cards = [normalize_card(c) for c in cards]
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, stream_with_context
+from flask_cors import CORS
+from werkzeug.local import LocalProxy
+from helper import load_set_mapping
+from album_store import create_album_store
+from album_view import MAX_PAGE_LIMIT, PAGE_LIMIT, AlbumViewCache, decode_cursor
+from catalog import LiveCatalog
+from http_cache import compress_response, make_etag, not_modified, with_validators
+from search_index import SUGGEST_LIMIT, SEARCH_LIMIT, normalize_text
+from query_cache import QueryCache
+
+# Routen als Blueprint, Katalog und Albumspeicher hängen an der App (siehe create_app)
+api = Blueprint("api", __name__)
+
+
+def _resource(name):
+    return LocalProxy(lambda: current_app.extensions["karten"][name])
+
+
+# Katalog + Suchindizes, geänderte Set-Dateien werden im Hintergrund nachgeladen
+live_catalog = _resource("live_catalog")
+# Alben in SQLite (Standard) oder wie bisher als JSON-Dateien, siehe ALBUM_BACKEND
+album_store = _resource("album_store")
+search_cache = _resource("search_cache")
+# Gemergte Albumkarten + Summen, eigene Schreibzugriffe werden inkrementell eingearbeitet
+album_views = _resource("album_views")
+
+
+def create_app(catalog=None, store=None):
+    """
+    Baut die Flask-App. Ohne Argumente wie bisher mit dem Katalog aus cache/ (samt Watcher) und dem
+    Albumspeicher aus ALBUM_BACKEND; Tests übergeben eigene, damit der Arbeitsbaum unberührt bleibt.
+    """
+    app = Flask(__name__)
+    CORS(app, supports_credentials=True)
+    if catalog is None:
+        catalog = LiveCatalog()
+        catalog.start_watcher()
+    if store is None:
+        store = create_album_store()
+    app.extensions["karten"] = {
+        "live_catalog": catalog,
+        "album_store": store,
+        "search_cache": QueryCache(maxsize=512),
+        "album_views": AlbumViewCache(store),
+    }
+    app.before_request(handle_options)
+    # gzip/brotli für größere JSON-Antworten (Kartendetails mit vielen gleichen Bild-URLs)
+    app.after_request(compress_response)
+    app.register_blueprint(api)
+    return app
+
 
-@app.before_request
 def handle_options():
     if request.method == 'OPTIONS':
         return '', 200
 
-@app.route("/search", methods=["GET"])
+@api.route("/search", methods=["GET"])
 def search_cards():
     query = request.args.get("q", "").strip()
     #print(f"[DEBUG] Search query received: '{query}'")
@@ -25,50 +65,71 @@ def search_cards():
         print("[DEBUG] Empty query, returning empty list")
         return jsonify([])
 
-    # TODO: Suche auf Set etc erweitern
-    # Suche nur anhand des Namens, setzt Score per partial_ratio (ähnlich Fuse.js)
-    names = [c["name"] or "" for c in normalized_cards]
+    # Stand einmal festhalten, ein Reload während der Anfrage ändert ihn nicht
+    state = live_catalog.current
+    key = (normalize_text(query), SEARCH_LIMIT)
+    etag = make_etag("search", state.catalog.fingerprint, key)
+    cached = not_modified(etag, state.catalog.modified)
+    if cached:
+        return cached
+
+    def run_search():
+        # Sucht über Name, Setname, Setcode und Nummer (z.B. "Pikachu 25 sv3pt5")
+        results = state.search_index.search(query)
+        #print(f"[DEBUG] Number of matches found: {len(results)}")
 
-    results = process.extract(
-        query, names, scorer=fuzz.partial_ratio, limit=50
-    )
-    #print(f"[DEBUG] Number of matches found: {len(results)}")
+        # Ergebnisse sind bereits absteigend nach Score sortiert
+        return [{**card.to_dict(), "_score": score} for card, score in results]
 
-    # Map Ergebnisse zurück auf Kartenobjekte + Score
-    filtered = []
-    for match in results:
-        name_match, score, idx = match
-        card = normalized_cards[idx]
-        filtered.append({**card, "_score": score})
-    #print(f"[DEBUG] Number of filtered cards before sorting: {len(filtered)}")
+    filtered = search_cache.get_or_compute(key, state.catalog.version, run_search)
+    return with_validators(jsonify(filtered), etag, state.catalog.modified)
 
-    # Sortiere absteigend nach Score
-    filtered.sort(key=lambda x: x["_score"], reverse=True)
+@api.route("/search/stats", methods=["GET"])
+def search_cache_stats():
+    return jsonify(search_cache.stats())
+
+@api.route("/suggest", methods=["GET"])
+def suggest_names():
+    # Autovervollständigung beim Tippen, die volle /search läuft erst beim Absenden
+    query = request.args.get("q", "").strip()
+    limit = min(request.args.get("k", SUGGEST_LIMIT, type=int), 50)
+    if not query or limit <= 0:
+        return jsonify([])
+    return jsonify(live_catalog.current.prefix_index.suggest(query, limit))
 
-    return jsonify(filtered)
+@api.route("/catalog/reload", methods=["POST"])
+def reload_catalog():
+    # Sofort prüfen statt auf den Watcher zu warten, z.B. direkt nach update_cache.py
+    changed = live_catalog.reload_if_changed()
+    return jsonify({"reloaded": changed, "version": live_catalog.current.catalog.version})
 
-@app.route("/album", methods=["POST"])
+@api.route("/album", methods=["POST"])
 def create_album():
     album_data = request.get_json()
     if not album_data or "album_name" not in album_data:
         return jsonify({"error": "Fehlende Albumdaten"}), 400
 
-    os.makedirs(ALBUM_PATH, exist_ok=True)
-    album_file = os.path.join(ALBUM_PATH, f"{album_data['album_name']}.json")
-    with open(album_file, "w", encoding="utf-8") as f:
-        json.dump(album_data, f, ensure_ascii=False, indent=2)
+    album_store.save(album_data["album_name"], album_data)
+    album_views.invalidate(album_data["album_name"])
     return jsonify({"status": "Album gespeichert"}), 200
 
 
-@app.route("/album/<album_name>", methods=["GET"])
+@api.route("/album/<album_name>", methods=["GET"])
 def get_album(album_name):
-    album = load_album(album_name)
+    version = album_store.version(album_name)
+    if version is None:
+        return jsonify({"error": "Album nicht gefunden"}), 404
+    etag = make_etag("album", album_name, version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    album = album_store.load(album_name)
     if album is None:
         return jsonify({"error": "Album nicht gefunden"}), 404
-    return jsonify(album)
+    return with_validators(jsonify(album), etag)
 
 
-@app.route("/album/<album_name>/add_cards", methods=["POST"])
+@api.route("/album/<album_name>/add_cards", methods=["POST"])
 def add_card_to_album(album_name):
     print("Called add_card_to_album")
     card_data = request.get_json()
@@ -80,76 +141,141 @@ def add_card_to_album(album_name):
     reverse = card_data.get("count_reverse", 0)
     print(f"Adding card {card_data['card_id']} to album {album_name} (normal: {normal}, reverse: {reverse})")
 
-    album = load_album(album_name)
-    if album is None:
-        album = {"album_name": album_name, "cards": []}
-    if "cards" not in album:
-        album["cards"] = []
-
-    # Suche, ob Karte schon existiert (via card_id)
-    existing = next((c for c in album["cards"] if c["card_id"] == card_data["card_id"]), None)
     card_id = card_data["card_id"]
-    card_set = card_id.split("-")[0] if "-" in card_id else "Unknown"
-    print(f"Card ID: {card_id}, Set: {card_set}")
+    entries, before, after = album_store.add_cards_versioned(album_name, [(card_id, normal, reverse)])
+    album_views.apply_write(album_name, entries, before, after)
+    print(f"Card ID: {card_id}, Set: {entries[card_id]['set']}")
 
-    if existing:
-        # Counter erhöhen
-        existing["count_normal"] = existing.get("count_normal", 0) + normal
-        existing["count_reverse"] = existing.get("count_reverse", 0) + reverse
-    else:
-        # Neue Karte mit Counter anlegen
-        album["cards"].append({
-            "card_id": card_id,
-            "set": card_set,
-            "count_normal": normal,
-            "count_reverse": reverse
-        })
-
-    save_album(album_name, album)
     return jsonify({"status": "Karte hinzugefügt"}), 200
 
-@app.route("/album/<album_name>/cards", methods=["GET"])
+def _valid_count(count):
+    # bool ist auch ein int, True als Anzahl ist aber sicher ein Fehler im Client
+    return isinstance(count, int) and not isinstance(count, bool) and count >= 0
+
+
+@api.route("/album/<album_name>/add_cards/batch", methods=["POST"])
+def add_cards_batch(album_name):
+    # Viele Karten auf einmal (Bulk-Sortieren): [{card_id, count_normal, count_reverse}, ...]
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get("cards")
+    if not isinstance(payload, list) or not payload:
+        return jsonify({"error": "Keine Karten angegeben"}), 400
+
+    items, results = [], []
+    for item in payload:
+        card_id = item.get("card_id") if isinstance(item, dict) else None
+        normal = item.get("count_normal", 1) if card_id else None
+        reverse = item.get("count_reverse", 0) if card_id else None
+        if not isinstance(card_id, str) or not card_id:
+            results.append({"card_id": card_id, "status": "error", "error": "Keine Karte angegeben"})
+        elif not _valid_count(normal) or not _valid_count(reverse) or normal + reverse == 0:
+            results.append({"card_id": card_id, "status": "error", "error": "Ungültige Anzahl"})
+        else:
+            items.append((card_id, normal, reverse))
+            results.append({"card_id": card_id, "status": "ok"})
+
+    if not items:
+        return jsonify({"error": "Keine gültigen Karten angegeben", "added": 0, "results": results}), 400
+    entries, before, after = album_store.add_cards_versioned(album_name, items)
+    album_views.apply_write(album_name, entries, before, after)
+    for result in results:
+        if result["status"] == "ok":
+            entry = entries[result["card_id"]]
+            result["count_normal"] = entry["count_normal"]
+            result["count_reverse"] = entry["count_reverse"]
+    print(f"Batch: {len(items)} Karten ({len(entries)} verschiedene) zu Album {album_name} hinzugefügt")
+    return jsonify({"status": "Karten hinzugefügt", "added": len(items), "results": results}), 200
+
+def _paging_args(args):
+    """(limit, cursor, Fehlermeldung) aus ?limit=/&cursor=; ein leerer Cursor heißt erste Seite."""
+    limit = args.get("limit", type=int)
+    if "limit" in args and (limit is None or not 1 <= limit <= MAX_PAGE_LIMIT):
+        return None, None, f"Ungültiges limit, erlaubt sind 1 bis {MAX_PAGE_LIMIT}"
+    cursor = args.get("cursor") or None
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            return None, None, str(e)
+    return limit or PAGE_LIMIT, cursor, None
+
+@api.route("/album/<album_name>/cards", methods=["GET"])
 def get_album_cards(album_name):
+    # Ohne Parameter wie bisher alles in Album-Reihenfolge. Mit ?limit=/&cursor= seitenweise nach Set
+    # und Nummer sortiert, mit ?format=ndjson (oder Accept: application/x-ndjson) eine Karte pro Zeile.
     print("getalbumcalled")
-    album = load_album(album_name)
-    if album is None or "cards" not in album:
+    paged = "limit" in request.args or "cursor" in request.args
+    limit, cursor, error = _paging_args(request.args)
+    if error:
+        # Wie beim Batch: kaputte Parameter sind ein Fehler, kein stilles Zurückfallen auf alles
+        return jsonify({"error": error}), 400
+    stream = request.args.get("format") == "ndjson" or \
+        request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"]) == "application/x-ndjson"
+
+    # Version vor dem Aufbau der Antwort: unverändertes Album + Katalog -> 304 ohne Serialisieren
+    catalog = live_catalog.current.catalog
+    version = album_store.version(album_name)
+    etag = make_etag("cards", album_name, version, catalog.fingerprint, paged, stream, limit, cursor)
+    if version is not None:
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+    view = album_views.get(album_name, catalog)
+    if view is None:
         print("nocards")
-        return jsonify({"cards": [], "total_cards": 0})
-
-    raw_cards = album["cards"]
-    result = []
-    total_count = 0
-
-    for entry in raw_cards:
-        card_id = entry["card_id"]
-        card = lookup_card_by_id(card_id, normalized_cards)
-        if card:
-            # Counts mergen
-            merged = {
-                **card,  # alle Details (name, image, set, prices, …)
-                "count_normal": entry.get("count_normal", 0),
-                "count_reverse": entry.get("count_reverse", 0),
-            }
-            total_count += merged["count_normal"] + merged["count_reverse"]
-            result.append(merged)
-
-    print(result, total_count)
-    return jsonify({"cards": result, "total_cards": total_count})
-
-@app.route("/cards/details", methods=["GET"])
+        if stream:
+            return Response("", mimetype="application/x-ndjson")
+        return jsonify({"cards": [], "total_cards": 0, **({"next_cursor": None} if paged else {})})
+
+    next_cursor = None
+    if paged:
+        try:
+            cards, next_cursor = view.page(limit, cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    elif stream:
+        cards = view.snapshot()
+    else:
+        # cards + total_cards wie bisher, dazu Wert (priceLow/priceReverse) und Karten pro Set
+        return with_validators(jsonify(view.payload()), etag)
+
+    totals = view.totals()
+    if not stream:
+        return with_validators(jsonify({"cards": cards, "next_cursor": next_cursor, **totals}), etag)
+
+    def lines():
+        # Zeile für Zeile serialisiert, der Speicher wächst nicht mit der Albumgröße
+        for card in cards:
+            yield json.dumps(card, ensure_ascii=False) + "\n"
+
+    headers = {"X-Total-Cards": str(totals["total_cards"])}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return with_validators(Response(stream_with_context(lines()), mimetype="application/x-ndjson",
+                                    headers=headers), etag)
+
+@api.route("/cards/details", methods=["GET"])
 def get_card_details():
     ids = request.args.get("ids", "").split(",")
     if not ids:
         print("no id")
         return jsonify({"error": "Keine card_id angegeben"}), 400
 
-    card =[lookup_card_by_id(i, normalized_cards) for i in ids]
+    catalog = live_catalog.current.catalog
+    etag = make_etag("details", catalog.fingerprint, ids)
+    cached = not_modified(etag, catalog.modified)
+    if cached:
+        return cached
+
+    card = [c.to_dict() if c else None for c in catalog.get_many(ids)]
     if card is None:
         print("card not found")
         return jsonify({"error": "Karte nicht gefunden"}), 404
     print(card)
-    return jsonify(card)
+    return with_validators(jsonify(card), etag, catalog.modified)
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    create_app().run(debug=True, port=5000)
@@ -0,0 +1,138 @@
+import hashlib
+import itertools
+import threading
+import time
+
+from helper import CardRecord
+from search_index import SearchIndex, PrefixIndex
+from snapshot import (SNAPSHOT_PATH, changed_sources, compile_snapshot, load_snapshot, snapshot_records,
+                      try_write_snapshot)
+
+RELOAD_INTERVAL = 10  # Sekunden zwischen zwei Prüfungen auf geänderte Set-Dateien
+
+# Jeder neu geladene Katalog bekommt eine neue Version, damit Caches veraltete Einträge erkennen
+_versions = itertools.count(1)
+
+
+class CardCatalog:
+    """Kompakte Karten (CardRecord) mit Index card_id -> Karte, einmal beim Start gebaut."""
+
+    def __init__(self, records, fingerprint=None, modified=None):
+        self.version = next(_versions)
+        # Inhaltsbasiert (aus dem Snapshot-Manifest) und damit in allen Worker-Prozessen gleich, anders als
+        # die Versionsnummer; für ETags. `modified` ist die jüngste mtime der Quelldateien (Unix-Zeit).
+        self.fingerprint = fingerprint or f"v{self.version}"
+        self.modified = modified
+        self.cards = list(records)
+        self._by_id = {}
+        for card in self.cards:
+            # Bei doppelten IDs gewinnt wie beim linearen Scan die erste Karte
+            self._by_id.setdefault(card.id, card)
+
+    @classmethod
+    def load(cls, snapshot_path=SNAPSHOT_PATH):
+        # Aus dem Snapshot, der bei geänderten Set-Dateien automatisch neu gebaut wird
+        snapshot = load_snapshot(snapshot_path)
+        return cls(snapshot_records(snapshot), *manifest_fingerprint(snapshot["manifest"]))
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __contains__(self, card_id):
+        return card_id in self._by_id
+
+    def get(self, card_id):
+        return self._by_id.get(card_id)
+
+    def get_many(self, card_ids):
+        """Liefert die Karten in der Reihenfolge der IDs, None für unbekannte IDs."""
+        by_id = self._by_id
+        return [by_id.get(card_id) for card_id in card_ids]
+
+
+def manifest_fingerprint(manifest):
+    """(Fingerprint, jüngste mtime) eines Snapshot-Manifests, siehe CardCatalog."""
+    sha = hashlib.sha1()
+    for key in sorted(manifest):
+        sha.update(f"{key}:{manifest[key]['sha1']}\n".encode("utf-8"))
+    modified = max((entry["mtime_ns"] for entry in manifest.values()), default=0) / 1e9
+    return sha.hexdigest()[:16], modified or None
+
+
+class CatalogState:
+    """Unveränderlicher Stand aus Katalog und den darauf gebauten Suchindizes."""
+
+    __slots__ = ("catalog", "search_index", "prefix_index")
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.search_index = SearchIndex(catalog.cards)
+        self.prefix_index = PrefixIndex(catalog.cards)
+
+
+class LiveCatalog:
+    """
+    Hält den aktuellen CatalogState und lädt geänderte Set-Dateien nach, ohne die API neu zu starten.
+
+    Ein Reload parst nur die geänderten Sets neu, baut den neuen Stand komplett nebenher und
+    tauscht danach nur die Referenz `current` aus. Requests lesen `current` einmal am Anfang
+    und sehen dadurch immer entweder den alten oder den neuen Stand, nie einen halben.
+    """
+
+    def __init__(self, snapshot_path=SNAPSHOT_PATH):
+        self._path = snapshot_path
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._snapshot = load_snapshot(snapshot_path)
+        self._set_records = {
+            key: [CardRecord.from_row(row) for row in rows] for key, rows in self._snapshot["sets"].items()
+        }
+        self.current = self._build_state()
+
+    def _build_state(self):
+        records = itertools.chain.from_iterable(self._set_records.values())
+        return CatalogState(CardCatalog(records, *manifest_fingerprint(self._snapshot["manifest"])))
+
+    def reload_if_changed(self):
+        """Prüft das Manifest und tauscht bei Änderungen den Stand aus. Liefert die geänderten Dateien."""
+        with self._lock:
+            changed, removed, _ = changed_sources(self._snapshot["manifest"])
+            if not changed and not removed:
+                return []
+            start = time.perf_counter()
+            previous = self._snapshot
+            snapshot = compile_snapshot(previous)
+            try_write_snapshot(snapshot, self._path)
+
+            set_records = {}
+            for key, rows in snapshot["sets"].items():
+                # compile_snapshot übernimmt unveränderte Sets als dasselbe Objekt, deren Records bleiben
+                if previous["sets"].get(key) is rows and key in self._set_records:
+                    set_records[key] = self._set_records[key]
+                else:
+                    set_records[key] = [CardRecord.from_row(row) for row in rows]
+            self._snapshot, self._set_records = snapshot, set_records
+            self.current = self._build_state()
+            print(f"Katalog neu geladen ({', '.join(changed + removed)}) in "
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms, Version {self.current.catalog.version}")
+            return changed + removed
+
+    def start_watcher(self, interval=RELOAD_INTERVAL):
+        """Startet einen Daemon-Thread, der regelmäßig reload_if_changed aufruft."""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    # Alter Stand bleibt aktiv, nächster Versuch im nächsten Intervall
+                    print(f"Katalog-Reload fehlgeschlagen: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="catalog-watcher", daemon=True)
+        self._watcher.start()
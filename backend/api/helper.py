@@ -1,63 +1,137 @@
 import os
+import sys
 import json
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 ALBUM_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../cache/users/admin/albums'))
+CACHE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../cache'))
+SET_MAPPING_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../set_mapping.json"))
 
 def load_set_mapping(mapping_path=None):
     if mapping_path is None:
-        mapping_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../set_mapping.json"))
+        mapping_path = SET_MAPPING_PATH
     with open(mapping_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def load_album(album_name):
-    album_file = os.path.join(ALBUM_PATH, f"{album_name}.json")
+def load_album(album_name, base_path=ALBUM_PATH):
+    album_file = os.path.join(base_path, f"{album_name}.json")
     if not os.path.exists(album_file):
         return None
     with open(album_file, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def save_album(album_name, data):
-    os.makedirs(ALBUM_PATH, exist_ok=True)
-    album_file = os.path.join(ALBUM_PATH, f"{album_name}.json")
-    with open(album_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_album(album_name, data, base_path=ALBUM_PATH):
+    os.makedirs(base_path, exist_ok=True)
+    album_file = os.path.join(base_path, f"{album_name}.json")
+    write_json_atomic(album_file, data)
+
+def write_json_atomic(path, data):
+    # Erst in eine temporäre Datei, dann umbenennen: Leser sehen nie eine halb geschriebene Datei
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+@contextmanager
+def album_lock(album_name, base_path=ALBUM_PATH):
+    """
+    Exklusive Sperre pro Album über `<album>.lock`, gilt auch zwischen mehreren Worker-Prozessen.
+    Nicht reentrant: innerhalb der Sperre nicht noch einmal für dasselbe Album sperren.
+    """
+    os.makedirs(base_path, exist_ok=True)
+    with open(os.path.join(base_path, f"{album_name}.lock"), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class CardRecord:
+    """Kompakte Karte: nur die Felder, die die API ausliefert, statt des kompletten Roh-JSON."""
+
+    __slots__ = ("id", "name", "set", "number", "rarity", "image", "priceLow", "priceReverse", "updatedAt")
+
+    def __init__(self, **fields):
+        for field in self.__slots__:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_raw(cls, raw, set_name=None):
+        # Gleiche Felder und Defaults wie früher die normalisierten Roh-Dicts
+        cardmarket = raw.get("cardmarket") or {}
+        prices = cardmarket.get("prices") or {}
+        images = raw.get("images")
+        updated_at = cardmarket.get("updatedAt")
+        rarity = raw.get("rarity")
+        return cls(
+            id=raw.get("id"),
+            name=raw.get("name"),
+            set=set_name or raw.get("setName"),
+            number=raw.get("number"),
+            rarity=sys.intern(rarity) if rarity else rarity,
+            image=images.get("small") if images else None,
+            priceLow=prices.get("lowPrice", 0) or 0,
+            priceReverse=prices.get("reverseHolo", 0) or None,
+            updatedAt=sys.intern(updated_at) if updated_at else updated_at,
+        )
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_row(cls, row):
+        """Baut einen Record aus einem Tupel in __slots__-Reihenfolge (Snapshot)."""
+        record = cls.__new__(cls)
+        # Direktes Entpacken ist beim Laden von ~23k Karten deutlich schneller als setattr in einer Schleife
+        (record.id, record.name, record.set, record.number, record.rarity, record.image,
+         record.priceLow, record.priceReverse, record.updatedAt) = row
+        return record
+
+    def to_row(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f"CardRecord({self.id!r}, {self.name!r})"
+
+def load_set_records(path, set_name=None):
+    """Liest eine Set-Datei aus dem Cache und projiziert sie direkt auf CardRecords."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        return []
+    return [CardRecord.from_raw(card, set_name) for card in data]
 
-def load_cards():
-    cards = []
-    base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../cache'))
-    set_mapping = load_set_mapping()  # Set-Mapping laden
+def load_card_records():
+    """
+    Alle Karten aus dem Cache als CardRecords. Die Roh-Dicts eines Sets werden direkt nach dem
+    Projizieren wieder freigegeben.
+    """
+    records = []
+    set_mapping = load_set_mapping()
 
-    for filename in os.listdir(base_path):
+    for filename in os.listdir(CACHE_PATH):
         if filename.endswith(".json"):
-            set_key = filename.split('.')[0]
-            set_name = set_mapping.get(set_key, None)  # Gemappten Setnamen holen, falls vorhanden
-            path = os.path.join(base_path, filename)
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    for card in data:
-                        card["set"] = set_name
-                        cards.append(card)
-    return cards
-
-def normalize_card(raw):
-    #print(f"Normalizing card: {raw.get('name')}")
-    low = raw.get("cardmarket", {}).get("prices", {}).get("lowPrice", 0) or 0
-    reverse = raw.get("cardmarket", {}).get("prices", {}).get("reverseHolo", 0) or None
-    return {
-        "id": raw.get("id"),
-        "name": raw.get("name"),
-        "set": raw.get("set") or raw.get("setName"),
-        "number": raw.get("number"),
-        "rarity": raw.get("rarity"),
-        "image": raw.get("images", {}).get("small") if raw.get("images") else None,
-        "priceLow": low,
-        "priceReverse": reverse,
-        "updatedAt": raw.get("cardmarket", {}).get("updatedAt"),
-    }
-
-def lookup_card_by_id(card_id, normalized_cards=None):
-    for card in normalized_cards:
-        if card["id"] == card_id:
-            return card
-    return None
+            set_name = set_mapping.get(filename.split('.')[0], None)
+            records.extend(load_set_records(os.path.join(CACHE_PATH, filename), set_name))
+    return records
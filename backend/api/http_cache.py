@@ -0,0 +1,105 @@
+"""
+Bedingte GETs (ETag/Last-Modified, 304) und Komprimierung (gzip, brotli falls installiert) für die API.
+
+Die ETags werden aus Album- und Katalogversion abgeleitet, bevor die Antwort gebaut wird. Bei einem
+Treffer entfällt damit nicht nur die Übertragung, sondern auch das Serialisieren.
+"""
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional, sonst nur gzip
+    brotli = None
+
+COMPRESS_MIN_SIZE = 1024  # Bytes; kleinere Antworten lohnen den Header-Overhead nicht
+COMPRESS_MIMETYPES = {"application/json", "application/x-ndjson"}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Komprimierte Varianten bekommen einen eigenen (starken) ETag: "<etag>-gz" bzw. "<etag>-br"
+_ENCODING_SUFFIX = {"gzip": "-gz", "br": "-br"}
+
+
+def make_etag(*parts):
+    """Starker ETag (ohne Anführungszeichen) aus Versionsbestandteilen, z.B. Album- und Katalogversion."""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:24]
+
+
+def http_date(timestamp):
+    return format_datetime(datetime.fromtimestamp(timestamp, tz=timezone.utc), usegmt=True)
+
+
+def _matching_etag(if_none_match, etag):
+    """ETag aus If-None-Match, der zu `etag` gehört (auch als komprimierte Variante), sonst None."""
+    for tag in if_none_match:
+        if tag == etag or tag in (etag + suffix for suffix in _ENCODING_SUFFIX.values()):
+            return tag
+    return None
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Prüft If-None-Match (bzw. If-Modified-Since, falls kein ETag mitkam) gegen den aktuellen Stand.
+    Liefert eine fertige 304-Antwort oder None, wenn die volle Antwort gebaut werden muss.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match:
+        matched = etag if if_none_match.star_tag else _matching_etag(if_none_match, etag)
+        if matched is None:
+            return None
+        # 304 nennt den ETag der Variante, die der Client schon hat
+        etag = matched
+    elif last_modified is None or request.if_modified_since is None:
+        return None
+    elif int(last_modified) > request.if_modified_since.timestamp():
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    # Immer erst nachfragen, die Antwort selbst darf aber im Browser liegen bleiben
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response):
+    """after_request-Hook: komprimiert ausreichend große JSON-Antworten je nach Accept-Encoding."""
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed \
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if encoding == "br":
+        body = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + _ENCODING_SUFFIX[encoding], weak)
+    return response
+
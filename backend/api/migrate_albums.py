@@ -0,0 +1,23 @@
+"""
+Übernimmt die JSON-Alben aus cache/users/admin/albums (z.B. b2.json, domi.json) in die SQLite-Datenbank.
+
+    python migrate_albums.py               # nur Alben, die in der Datenbank noch fehlen
+    python migrate_albums.py --overwrite   # vorhandene Alben in der Datenbank ersetzen
+"""
+import argparse
+
+from album_store import ALBUM_DB_PATH, JsonAlbumStore, SqliteAlbumStore, migrate_json_albums
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON-Alben nach SQLite migrieren")
+    parser.add_argument("--db", default=ALBUM_DB_PATH, help="Pfad zur SQLite-Datenbank")
+    parser.add_argument("--overwrite", action="store_true", help="Vorhandene Alben überschreiben")
+    args = parser.parse_args()
+
+    source = JsonAlbumStore()
+    target = SqliteAlbumStore(args.db)
+    migrated = migrate_json_albums(target, source, overwrite=args.overwrite)
+    for album_name in migrated:
+        album = target.load(album_name)
+        print(f"{album_name}: {len(album['cards'])} Karten")
+    print(f"{len(migrated)} Alben nach {args.db} migriert")
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class QueryCache:
+    """
+    Begrenzter LRU-Cache für Suchergebnisse.
+
+    Alle Einträge gehören zu einer Katalogversion; kommt eine neuere Version (Cache neu geladen),
+    wird der Cache geleert. Anfragen, die noch mit einer älteren Version laufen, werden berechnet,
+    aber weder aus dem Cache bedient noch gespeichert. Gleichzeitige identische Anfragen derselben
+    Version warten auf dieselbe Berechnung.
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._pending = {}  # (key, version) -> Future
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _check_version(self, version):
+        # Versionen steigen monoton (siehe catalog._versions), eine späte alte Anfrage leert nichts
+        if self._version is None or version > self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get_or_compute(self, key, version, compute):
+        with self._lock:
+            self._check_version(version)
+            if version == self._version and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._pending.get((key, version))
+            owner = pending is None
+            if owner:
+                pending = self._pending[key, version] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop((key, version), None)
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            self._pending.pop((key, version), None)
+            # Inzwischen neu geladener Katalog: Ergebnis ausliefern, aber nicht mehr cachen
+            if version == self._version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        pending.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "version": self._version,
+            }
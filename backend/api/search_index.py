@@ -0,0 +1,370 @@
+import heapq
+import math
+import unicodedata
+from bisect import bisect_left
+from array import array
+from collections import Counter
+
+from rapidfuzz import process, fuzz
+
+SEARCH_LIMIT = 50
+SCORE_CUTOFF = 60
+NGRAM_SIZE = 3
+MAX_CANDIDATES = 300     # so viele Namen werden nach dem N-Gramm-Vorfilter gescort
+STRONG_SCORE = 90        # ab hier gilt ein Treffer als echt (darunter v.a. WRatio-Teiltreffer), für den Recall
+MIN_NGRAM_QUERY = 3      # kürzere Anfragen gehen per Vollscan über alle Namen
+SUGGEST_LIMIT = 10
+SUGGEST_SCAN_LIMIT = 500  # maximal so viele Einträge pro Präfix ansehen
+
+
+def normalize_text(text):
+    """Casefold, Akzente entfernen ("Pokémon" -> "pokemon"), Bindestriche und Whitespace vereinheitlichen."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.casefold().replace("-", " ").split())
+
+
+def normalize_number(number):
+    number = normalize_text(number).replace(" ", "")
+    return number.lstrip("0") or number
+
+
+def ngrams(text, n=NGRAM_SIZE):
+    # Mit Leerzeichen aufgefüllt, damit Wortanfang und -ende eigene N-Gramme bekommen
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def set_code_of(card_id):
+    # Gleiche Konvention wie beim Album: "sv3pt5-25" -> "sv3pt5"
+    return card_id.split("-")[0] if card_id and "-" in card_id else ""
+
+
+class SearchIndex:
+    """
+    Einmal beim Start gebauter Suchindex über Name, Setname, Setcode und Kartennummer.
+
+    Namen werden nur einmal pro eindeutigem Namen gescort (rapidfuzz im Batch),
+    Set und Nummer werden aus der Suchanfrage erkannt und als Filter genutzt.
+    """
+
+    def __init__(self, cards):
+        self.cards = list(cards)
+        self.names = []          # eindeutige, normalisierte Namen
+        self.name_cards = []     # Name-Index -> Karten-Indizes
+        self.card_name = []      # Karten-Index -> Name-Index
+        self.card_number = []    # Karten-Index -> normalisierte Nummer
+        self.set_cards = {}      # Setcode -> Karten-Indizes
+        self.set_names = {}      # normalisierter Setname -> Setcodes
+        self.name_words = {}     # Wort -> Name-Indizes, auch ohne "'s" ("rocket's" -> "rocket")
+        self.numbers = set()
+
+        name_ids = {}
+        for idx, card in enumerate(self.cards):
+            name = normalize_text(card.name)
+            name_id = name_ids.get(name)
+            if name_id is None:
+                name_id = name_ids[name] = len(self.names)
+                self.names.append(name)
+                self.name_cards.append([])
+                for word in name.split():
+                    self.name_words.setdefault(word, set()).add(name_id)
+                    if word.endswith("'s"):
+                        self.name_words.setdefault(word[:-2], set()).add(name_id)
+            self.name_cards[name_id].append(idx)
+            self.card_name.append(name_id)
+
+            number = normalize_number(card.number)
+            self.card_number.append(number)
+            if number:
+                self.numbers.add(number)
+
+            code = normalize_text(set_code_of(card.id))
+            if code:
+                self.set_cards.setdefault(code, []).append(idx)
+            set_name = normalize_text(card.set)
+            if set_name and code:
+                self.set_names.setdefault(set_name, set()).add(code)
+
+        self._max_set_name_tokens = max((len(n.split()) for n in self.set_names), default=0)
+
+        # Invertierter Index N-Gramm -> Name-Indizes
+        postings = {}
+        for name_id, name in enumerate(self.names):
+            for gram in ngrams(name):
+                postings.setdefault(gram, []).append(name_id)
+        self.ngram_index = {gram: array("I", ids) for gram, ids in postings.items()}
+        # Seltene N-Gramme zählen mehr, sonst verdrängen z.B. die von "(promo)" die eigentlichen Treffer
+        self.ngram_weight = {gram: math.log(len(self.names) / len(ids)) + 1 for gram, ids in postings.items()}
+        weights = self.ngram_weight
+        self.name_weight = [sum(weights[gram] for gram in ngrams(name)) for name in self.names]
+        # Namen ohne eigenes inneres N-Gramm ("N"): WRatio gibt ihnen als Teiltreffer bis zu 90, immer scoren
+        self.tiny_names = [name_id for name_id, name in enumerate(self.names) if len(name) < NGRAM_SIZE]
+
+    def name_candidates(self, name_query, limit=MAX_CANDIDATES):
+        """
+        Vorfilter über das N-Gramm-Index: die `limit` Namen mit der höchsten Abdeckung durch gemeinsame
+        N-Gramme, dazu die sehr kurzen Namen. Liefert None, wenn die Anfrage zu kurz ist oder kein N-Gramm
+        trifft und voll gescannt werden soll.
+        """
+        if len(name_query) < MIN_NGRAM_QUERY:
+            return None
+        hits = Counter()
+        weights = self.ngram_weight
+        query_grams = ngrams(name_query)
+        for gram in query_grams:
+            ids = self.ngram_index.get(gram)
+            if ids:
+                weight = weights[gram]
+                for name_id in ids:
+                    hits[name_id] += weight
+        if not hits:
+            # Kein gemeinsames N-Gramm mit irgendeinem Namen: der Fallback würde ohnehin alles scoren
+            return None
+        # Wie WRatio: Anteil der Anfrage, die im Namen steckt, oder (Teiltreffer, x0.9) Anteil des Namens,
+        # der in der Anfrage steckt; sonst fallen kurze Namen wie "Aron" in "Primarina" heraus
+        query_weight = sum(weights.get(gram, 0) for gram in query_grams) or 1
+        name_weight = self.name_weight
+        top = heapq.nlargest(limit, hits.items(), key=lambda item: max(
+            item[1] / query_weight, 0.9 * item[1] / name_weight[item[0]]))
+        return list({name_id for name_id, _ in top}.union(self.tiny_names))
+
+    def _is_name(self, tokens):
+        """True, wenn alle Tokens als Wörter in ein und demselben Namen vorkommen ("arceus vstar")."""
+        common = None
+        for token in tokens:
+            found = self.name_words.get(token)
+            if not found:
+                return False
+            common = set(found) if common is None else common & found
+            if not common:
+                return False
+        return common is not None
+
+    def _is_number(self, token):
+        # Nur Tokens mit Ziffern: "V", "GX", "EX" oder "VSTAR" sind Namensteile, auch wenn es solche Nummern gibt
+        return any(ch.isdigit() for ch in token) and normalize_number(token) in self.numbers
+
+    def _match_set_name(self, tokens, allow_all=False):
+        """
+        Sucht den längsten zusammenhängenden Setnamen in den Tokens. Ohne `allow_all` muss ein Rest übrig
+        bleiben (der Name), mit (wenn eine Nummer dabei ist) darf der Setname die ganze Anfrage sein.
+        """
+        longest = min(self._max_set_name_tokens, len(tokens) - (0 if allow_all else 1))
+        for length in range(longest, 0, -1):
+            for start in range(len(tokens) - length + 1):
+                codes = self.set_names.get(" ".join(tokens[start:start + length]))
+                if codes:
+                    return codes, tokens[:start] + tokens[start + length:]
+        return None, tokens
+
+    def _set_candidates(self, set_codes):
+        return [i for code in sorted(set_codes) for i in self.set_cards[code]]
+
+    def parse_query(self, query):
+        """
+        Zerlegt eine Anfrage in (Setcodes oder None, Nummern, Namensteil).
+
+        Ein Setname gilt nur als Filter, wenn die Anfrage nicht selbst ein Kartenname ist ("Arceus VSTAR",
+        "Team Rocket") und der Rest in diesem Set noch einen Namen trifft ("charizard base set").
+        """
+        tokens = normalize_text(query).split()
+        set_codes = {t for t in tokens if t in self.set_cards}
+        rest = [t for t in tokens if t not in self.set_cards]
+        numbers = [t for t in rest if self._is_number(t)]
+        words = [t for t in rest if not self._is_number(t)]
+
+        if not set_codes and not self._is_name(words):
+            codes, remaining = self._match_set_name(words, allow_all=bool(numbers))
+            if codes and (numbers if not remaining
+                          else self._score_names(" ".join(remaining), self._set_candidates(codes))):
+                set_codes, words = codes, remaining
+
+        if not words and not numbers and set_codes:
+            return set_codes, set(), ""
+        if not words and not set_codes:
+            # Nur eine Zahl ohne Set: eher ein Name wie "151" als eine Kartennummer
+            return None, set(), " ".join(rest)
+        return set_codes or None, {normalize_number(n) for n in numbers}, " ".join(words)
+
+    def _score_names(self, name_query, candidates=None, prune=True, name_ids=None, exclude=None):
+        """
+        Scort eindeutige Namen und liefert {Karten-Index: Score}. `name_ids` gibt die Namen direkt vor,
+        `exclude` scort alle Namen außer diesen, sonst alle Namen der `candidates` bzw. (mit `prune`)
+        die aus dem N-Gramm-Vorfilter.
+        """
+        if name_ids is None and exclude is None and prune and candidates is None:
+            name_ids = self.name_candidates(name_query)
+        if name_ids is not None:
+            choices = {name_id: self.names[name_id] for name_id in name_ids}
+        elif exclude is not None:
+            # None-Einträge überspringt rapidfuzz, die Indizes bleiben dabei die Namens-IDs
+            choices = list(self.names)
+            for name_id in exclude:
+                choices[name_id] = None
+        elif candidates is None:
+            choices = self.names
+        else:
+            choices = {self.card_name[i]: self.names[self.card_name[i]] for i in candidates}
+        matches = process.extract(
+            name_query, choices, scorer=fuzz.WRatio, processor=None,
+            limit=None, score_cutoff=SCORE_CUTOFF,
+        )
+        scores = {}
+        for _, score, name_id in matches:
+            for idx in self.name_cards[name_id]:
+                scores[idx] = score
+        if candidates is not None:
+            scores = {i: scores[i] for i in candidates if i in scores}
+        return scores
+
+    def search(self, query, limit=SEARCH_LIMIT, prune=True):
+        """
+        Liefert bis zu `limit` Paare (Karte, Score), absteigend sortiert.
+        Mit prune=False werden alle Namen gescort (Vergleichsbasis für den N-Gramm-Vorfilter).
+        """
+        set_codes, numbers, name_query = self.parse_query(query)
+        if set_codes is None and not name_query:
+            return []
+
+        candidates = None
+        if set_codes is not None:
+            candidates = self._set_candidates(set_codes)
+
+        if name_query:
+            name_ids = self.name_candidates(name_query) if prune and candidates is None else None
+            scores = self._score_names(name_query, candidates, prune=False, name_ids=name_ids)
+            if name_ids is not None and len(scores) < limit:
+                # Zu wenige Treffer unter den vorgefilterten Namen: die übrigen Namen auch noch scoren
+                scores.update(self._score_names(name_query, exclude=name_ids))
+        else:
+            scores = dict.fromkeys(candidates, 100)
+
+        if numbers:
+            matching = [i for i in scores if self.card_number[i] in numbers]
+            # Mit Set ist die Nummer eindeutig genug für einen harten Filter
+            if set_codes is not None and matching:
+                scores = {i: scores[i] for i in matching}
+
+        card_number, card_name, names = self.card_number, self.card_name, self.names
+        top = heapq.nsmallest(limit, scores.items(), key=lambda item: (
+            card_number[item[0]] not in numbers,
+            -item[1],
+            len(names[card_name[item[0]]]),
+            item[0],
+        ))
+        return [(self.cards[idx], score) for idx, score in top]
+
+
+class PrefixIndex:
+    """
+    Sortiertes Array über eindeutige Kartennamen für die Autovervollständigung (/suggest).
+
+    Jeder Name steht einmal komplett und einmal ab jedem weiteren Wort drin,
+    damit "mewtwo" auch "Team Rocket's Mewtwo ex" findet.
+    """
+
+    def __init__(self, cards):
+        display = {}
+        for card in cards:
+            name = card.name or ""
+            key = normalize_text(name)
+            if key:
+                display.setdefault(key, " ".join(name.split()))
+
+        entries = set()
+        for key, name in display.items():
+            words = key.split()
+            for start in range(len(words)):
+                # start > 0 sortiert Wort-Treffer hinter Treffer am Namensanfang
+                entries.add((" ".join(words[start:]), start > 0, name))
+        entries = sorted(entries)
+        self._keys = [key for key, _, _ in entries]
+        self._entries = [(inner, name) for _, inner, name in entries]
+
+    def suggest(self, prefix, limit=SUGGEST_LIMIT):
+        """Liefert bis zu `limit` eindeutige Namen, die mit `prefix` (oder einem Wort darin) beginnen."""
+        prefix = normalize_text(prefix)
+        if not prefix:
+            return []
+        keys, entries = self._keys, self._entries
+        leading, inner, seen = [], [], set()
+        pos = bisect_left(keys, prefix)
+        end = min(len(keys), pos + SUGGEST_SCAN_LIMIT)
+        while pos < end and len(leading) < limit and keys[pos].startswith(prefix):
+            is_inner, name = entries[pos]
+            if name not in seen:
+                seen.add(name)
+                (inner if is_inner else leading).append(name)
+            pos += 1
+        return (leading + inner)[:limit]
+
+
+def sample_queries(index, sample_size=300, seed=1):
+    """Reproduzierbare Testanfragen aus den Namen des Index: Präfixe, Tippfehler und ganze Namen."""
+    import random
+
+    rng = random.Random(seed)
+    queries = []
+    for name in rng.sample(index.names, min(sample_size, len(index.names))):
+        kind = rng.randrange(3)
+        if kind == 0:      # Tippen: Präfix
+            queries.append(name[:max(MIN_NGRAM_QUERY, len(name) // 2)])
+        elif kind == 1:    # Tippfehler: ein Zeichen fehlt
+            pos = rng.randrange(len(name))
+            queries.append(name[:pos] + name[pos + 1:])
+        else:
+            queries.append(name)
+    return queries
+
+
+def recall_at_limit(full, pruned, min_score=0):
+    """
+    Anteil der Vollscan-Treffer (ab `min_score`), die auch die vorgefilterte Suche liefert. Karten mit
+    gleichem Score sind austauschbar (bei Gleichstand entscheidet nur die Namenslänge), gezählt werden
+    deshalb Scores.
+    """
+    full_scores = Counter(round(score, 6) for _, score in full if score >= min_score)
+    if not full_scores:
+        return 1.0
+    pruned_scores = Counter(round(score, 6) for _, score in pruned)
+    return sum((full_scores & pruned_scores).values()) / sum(full_scores.values())
+
+
+def _benchmark(sample_size=300, seed=1):
+    """Vergleicht N-Gramm-Vorfilter und Vollscan: Latenz, Recall@50 und Top-1-Übereinstimmung."""
+    import time
+    from catalog import CardCatalog
+
+    index = SearchIndex(CardCatalog.load().cards)
+    queries = sample_queries(index, sample_size, seed)
+
+    timings = {True: [], False: []}
+    recall, strong_recall, card_recall, top1 = [], [], [], 0
+    for query in queries:
+        results = {}
+        for prune in (False, True):
+            start = time.perf_counter()
+            results[prune] = index.search(query, prune=prune)
+            timings[prune].append(time.perf_counter() - start)
+        recall.append(recall_at_limit(results[False], results[True]))
+        strong_recall.append(recall_at_limit(results[False], results[True], STRONG_SCORE))
+        full = {card.id for card, _ in results[False]}
+        pruned = {card.id for card, _ in results[True]}
+        if full:
+            card_recall.append(len(full & pruned) / len(full))
+        if results[False] and results[True] and results[False][0][1] == results[True][0][1]:
+            top1 += 1
+
+    for prune, label in ((False, "Vollscan"), (True, "N-Gramm")):
+        samples = sorted(timings[prune])
+        print(f"{label:9} mean {sum(samples) / len(samples) * 1000:.2f} ms, "
+              f"p50 {samples[len(samples) // 2] * 1000:.2f} ms, p95 {samples[int(len(samples) * 0.95)] * 1000:.2f} ms")
+    print(f"Recall@{SEARCH_LIMIT}: {sum(recall) / len(recall):.3f} "
+          f"(ab Score {STRONG_SCORE}: {sum(strong_recall) / len(strong_recall):.3f}, "
+          f"gleiche Karten: {sum(card_recall) / len(card_recall):.3f}), "
+          f"Top-1-Score gleich: {top1}/{len(queries)} ({len(index.names)} Namen, {len(index.cards)} Karten)")
+
+
+if __name__ == "__main__":
+    _benchmark()
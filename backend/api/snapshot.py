@@ -0,0 +1,169 @@
+"""
+Vorkompilierter Katalog-Snapshot: alle cache/*.json plus set_mapping.json in einer Pickle-Datei.
+
+Der Snapshot enthält ein Manifest (Größe, mtime, SHA-1 je Quelldatei). Die API lädt ihn in
+Millisekunden und baut ihn nur neu, wenn sich eine Quelldatei tatsächlich geändert hat.
+
+    python snapshot.py          # Snapshot bauen bzw. aktualisieren
+    python snapshot.py --force  # immer neu bauen
+"""
+import hashlib
+import os
+import pickle
+import time
+
+from helper import CACHE_PATH, SET_MAPPING_PATH, CardRecord, load_set_mapping, load_set_records
+
+SNAPSHOT_PATH = os.path.join(CACHE_PATH, "catalog.snapshot")
+SNAPSHOT_FORMAT = 1
+MAPPING_KEY = "set_mapping.json"
+
+
+def _file_hash(path):
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def source_files():
+    """Alle Quelldateien des Katalogs: {Manifest-Schlüssel: Pfad}, Sets in listdir-Reihenfolge."""
+    files = {name: os.path.join(CACHE_PATH, name) for name in os.listdir(CACHE_PATH) if name.endswith(".json")}
+    files[MAPPING_KEY] = SET_MAPPING_PATH
+    return files
+
+
+def _stat_entry(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def changed_sources(manifest, files=None):
+    """
+    Vergleicht das Manifest mit den Dateien auf der Platte.
+    Liefert (geänderte, entfernte, nur angefasste Schlüssel); bei nur geänderter mtime entscheidet der Hash.
+    """
+    files = source_files() if files is None else files
+    changed, touched = [], []
+    for key, path in files.items():
+        entry = manifest.get(key)
+        if entry is None:
+            changed.append(key)
+            continue
+        size, mtime_ns = _stat_entry(path)
+        if (size, mtime_ns) == (entry["size"], entry["mtime_ns"]):
+            continue
+        if size != entry["size"] or _file_hash(path) != entry["sha1"]:
+            changed.append(key)
+        else:
+            # Nur angefasst, Inhalt gleich: mtime nachziehen, damit nicht jedes Mal gehasht wird
+            entry["mtime_ns"] = mtime_ns
+            touched.append(key)
+    removed = [key for key in manifest if key not in files]
+    return changed, removed, touched
+
+
+def _manifest_entry(path):
+    size, mtime_ns = _stat_entry(path)
+    return {"size": size, "mtime_ns": mtime_ns, "sha1": _file_hash(path)}
+
+
+def compile_snapshot(previous=None):
+    """
+    Kompiliert den Snapshot im Speicher; mit `previous` werden nur geänderte Sets neu geparst.
+    Liefert {"format", "fields", "manifest", "sets": {Datei: [Zeilen]}}.
+    """
+    files = source_files()
+    set_mapping = load_set_mapping()
+    if previous is not None:
+        changed, _, _ = changed_sources(previous["manifest"], files)
+        # Neues Mapping ändert Setnamen in allen Sets
+        rebuild = set(files) if MAPPING_KEY in changed else set(changed)
+    else:
+        rebuild = set(files)
+
+    manifest, sets = {}, {}
+    for key, source in files.items():
+        if key not in rebuild:
+            manifest[key] = previous["manifest"][key]
+            if key != MAPPING_KEY:
+                sets[key] = previous["sets"][key]
+            continue
+        manifest[key] = _manifest_entry(source)
+        if key != MAPPING_KEY:
+            set_name = set_mapping.get(key.split('.')[0], None)
+            sets[key] = [record.to_row() for record in load_set_records(source, set_name)]
+
+    return {"format": SNAPSHOT_FORMAT, "fields": CardRecord.__slots__, "manifest": manifest, "sets": sets}
+
+
+def build_snapshot(previous=None, path=SNAPSHOT_PATH):
+    snapshot = compile_snapshot(previous)
+    write_snapshot(snapshot, path)
+    return snapshot
+
+
+def write_snapshot(snapshot, path=SNAPSHOT_PATH):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """Liest den Snapshot oder liefert None, wenn er fehlt, kaputt oder in einem alten Format ist."""
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT \
+            or tuple(snapshot.get("fields", ())) != CardRecord.__slots__:
+        return None
+    return snapshot
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Lädt den Snapshot und baut ihn (inkrementell) neu, falls sich Quelldateien geändert haben."""
+    snapshot = read_snapshot(path)
+    if snapshot is not None:
+        changed, removed, touched = changed_sources(snapshot["manifest"])
+        if not changed and not removed:
+            if touched:
+                try_write_snapshot(snapshot, path)
+            return snapshot
+        print(f"Katalog-Snapshot veraltet ({len(changed)} geändert, {len(removed)} entfernt), baue neu")
+    snapshot = compile_snapshot(snapshot)
+    try_write_snapshot(snapshot, path)
+    return snapshot
+
+
+def try_write_snapshot(snapshot, path=SNAPSHOT_PATH):
+    try:
+        write_snapshot(snapshot, path)
+    except OSError as e:
+        # Schreibgeschützter Cache o.ä.: Katalog trotzdem ausliefern, nur ohne Snapshot-Datei
+        print(f"Katalog-Snapshot konnte nicht geschrieben werden: {e}")
+
+
+def snapshot_records(snapshot):
+    from_row = CardRecord.from_row
+    return [from_row(row) for rows in snapshot["sets"].values() for row in rows]
+
+
+if __name__ == "__main__":
+    import sys
+
+    start = time.perf_counter()
+    if "--force" in sys.argv:
+        snapshot = build_snapshot()
+    else:
+        snapshot = load_snapshot()
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = snapshot_records(read_snapshot())
+    loaded = time.perf_counter() - start
+    print(f"Snapshot {SNAPSHOT_PATH}: {len(snapshot['sets'])} Sets, {len(records)} Karten "
+          f"(bauen/prüfen {built * 1000:.0f} ms, laden {loaded * 1000:.0f} ms)")
@@ -1,15 +1,50 @@
 from dataclasses import dataclass
-from typing import Any, Optional, List, Type, Union
-from bs4 import BeautifulSoup
+from typing import Any, Dict, Optional, List, Tuple, Type, Union
+from bs4 import BeautifulSoup, SoupStrainer
 import html
 import re
-from .templated_plugin import ScrapedField, DataType
+from .templated_plugin import ScrapedField, DataType, ScraperPlugin
 
-class CardmarketPricePlugin:
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # optional, the 'strainer' engine needs only BeautifulSoup
+    etree = lxml_html = None
+
+PARSER_ENGINES = ("lxml", "strainer", "html.parser")
+
+# The only parts of a product page the plugin reads (a class list would only match single-class tags)
+_PAGE_STRAINER = SoupStrainer(class_=re.compile(r"(^|\s)(page-title-container|info-list-container)(\s|$)"))
+
+
+def _class_xpath(class_name: str) -> str:
+    return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+
+_PRICE_FIELDS = ("lowest_price", "price_trend", "avg_30_days", "avg_7_days", "avg_1_day")
+_FIELD_DESCRIPTIONS = {
+    "card_name": "Name of the card",
+    "card_set": "Set/expansion the card belongs to",
+    "card_rarity": "Rarity of the card",
+    "card_number": "Card number in the set",
+    "available_items": "Number of available items for sale",
+    "lowest_price": "Lowest price available for the card",
+    "price_trend": "Price trend of the card",
+    "avg_30_days": "Average price over the last 30 days",
+    "avg_7_days": "Average price over the last 7 days",
+    "avg_1_day": "Average price over the last day",
+    "card_expansion": "Expansion/set the card belongs to",
+}
+
+class CardmarketPricePlugin(ScraperPlugin):
     """Plugin that extracts price information from Cardmarket pages."""
     
     # Global configuration flag to control whether prices are stored as floats or formatted strings
     STORE_PRICES_AS_FLOAT = True  
+
+    # Parser engine: 'lxml' (fastest, falls back to 'strainer' without lxml), 'strainer' (html.parser,
+    # but only the title and info list subtrees) or 'html.parser' (full tree, the original behaviour)
+    PARSER_ENGINE = "lxml"
     
     def get_name(self) -> str:
         """Return the name of the plugin."""
@@ -164,101 +199,163 @@ class CardmarketPricePlugin:
         except ValueError:
             return 0.0
 
-    def parse(self, html_content: str) -> List[ScrapedField]:
+    def _extract_soup(self, soup) -> Tuple[Optional[Tuple[str, str]], List[Tuple[str, str]], Optional[str]]:
         """
-        Parse HTML content and extract Cardmarket price information.
-        
-        Args:
-            html_content: Raw HTML string
-            
-        Returns:
-            List of ScrapedField objects with price data
+        Pull the raw strings out of a BeautifulSoup tree: (h1 text, set span text) of the title,
+        the (dt, dd) text pairs of the info list and the rarity (None if there is no Rarity row).
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        results = []
-        
-        # Extract card name and set
+        title = None
         try:
             title_container = soup.select_one('.page-title-container')
             if title_container:
                 h1 = title_container.select_one('h1')
                 if h1:
-                    # Extract main card name (text before the span)
-                    card_name = h1.get_text().strip()
                     set_span = h1.select_one('span')
                     if set_span:
-                        card_name = card_name.replace(set_span.get_text(), '').strip()
-                        card_set = set_span.get_text().strip()
-                        
-                        results.append(ScrapedField(
-                            name="card_name",
-                            value=card_name,
-                            field_type=DataType.STRING,
-                            description="Name of the card",
-                            #accumulate=True
-                        ))
-                        
-                        results.append(ScrapedField(
-                            name="card_set",
-                            value=card_set,
-                            field_type=DataType.STRING,
-                            description="Set/expansion the card belongs to",
-                            #accumulate=True
-                        ))
+                        title = (h1.get_text(), set_span.get_text())
         except Exception as e:
             # Continue even if card name extraction fails
             pass
-        
+
         # Find the info container using a class-based selector
         container = soup.select_one('.info-list-container')
-        
         if not container:
-            # If we can't find the container, return what we have so far
-            return results
-            
+            return title, [], None
+
         # Find the definition list containing the key-value pairs
         dl = container.select_one('dl')
         if not dl:
-            return results
-            
+            return title, [], None
+
         # Extract all definition terms and values
         dt_elements = dl.select('dt')
         dd_elements = dl.select('dd')
-        
-        # Create a dictionary to map field keys to values
-        price_data = {}
+
+        pairs = []
+        rarity = None
         for i in range(min(len(dt_elements), len(dd_elements))):
             key = dt_elements[i].get_text().strip()
             # For the value, extract the text or try to find a specific span
             value_elem = dd_elements[i].select_one('span')
             value = value_elem.get_text().strip() if value_elem else dd_elements[i].get_text().strip()
-            price_data[key] = value
-        
-        # Extract card rarity
-        if "Rarity" in price_data:
-            # The actual text is in the SVG tooltip, so we'll extract the aria-label
-            rarity_dd = None
-            for i, dt in enumerate(dt_elements):
-                if dt.get_text().strip() == "Rarity" and i < len(dd_elements):
-                    rarity_dd = dd_elements[i]
-                    break
-                    
-            rarity_value = "Unknown"
-            if rarity_dd:
-                svg_elem = rarity_dd.select_one('svg')
+            pairs.append((key, value))
+            if key == "Rarity" and rarity is None:
+                # The actual text is in the SVG tooltip, so we'll extract the aria-label
+                svg_elem = dd_elements[i].select_one('svg')
                 if svg_elem and svg_elem.get('aria-label'):
-                    rarity_value = svg_elem.get('aria-label')
+                    rarity = svg_elem.get('aria-label')
                 else:
                     # Try to get any text in the dd element
-                    rarity_value = rarity_dd.get_text().strip()
+                    rarity = dd_elements[i].get_text().strip()
+        return title, pairs, rarity
+
+    def _extract_lxml(self, html_content: str) -> Tuple[Optional[Tuple[str, str]], List[Tuple[str, str]], Optional[str]]:
+        """Same as _extract_soup, but with lxml's C parser and XPath instead of a BeautifulSoup tree."""
+        if not html_content or not html_content.strip():
+            return None, [], None
+        try:
+            root = lxml_html.fromstring(html_content)
+        except (etree.ParserError, ValueError):
+            # e.g. a str with an XML encoding declaration: let lxml decode the bytes itself
+            root = lxml_html.fromstring(html_content.encode('utf-8'))
+
+        title = None
+        title_container = root.xpath(_class_xpath('page-title-container'))
+        if title_container:
+            h1 = title_container[0].xpath('.//h1')
+            if h1:
+                set_span = h1[0].xpath('.//span')
+                if set_span:
+                    title = (h1[0].text_content(), set_span[0].text_content())
+
+        container = root.xpath(_class_xpath('info-list-container'))
+        dl = container[0].xpath('.//dl') if container else None
+        if not dl:
+            return title, [], None
+
+        dt_elements = dl[0].xpath('.//dt')
+        dd_elements = dl[0].xpath('.//dd')
+        pairs = []
+        rarity = None
+        for dt, dd in zip(dt_elements, dd_elements):
+            key = dt.text_content().strip()
+            value_elem = dd.xpath('.//span')
+            value = value_elem[0].text_content().strip() if value_elem else dd.text_content().strip()
+            pairs.append((key, value))
+            if key == "Rarity" and rarity is None:
+                svg_elem = dd.xpath('.//svg')
+                if svg_elem and svg_elem[0].get('aria-label'):
+                    rarity = svg_elem[0].get('aria-label')
+                else:
+                    rarity = dd.text_content().strip()
+        return title, pairs, rarity
+
+    def extract(self, html_content: str, engine: Optional[str] = None):
+        """Raw (title, pairs, rarity) of a product page with the given (or the configured) parser engine."""
+        engine = engine or self.PARSER_ENGINE
+        if engine == "lxml" and lxml_html is None:
+            engine = "strainer"
+        if engine == "lxml":
+            return self._extract_lxml(html_content)
+        if engine == "strainer":
+            # Only the two subtrees we read are built, the rest of the page is skipped by the tokenizer
+            return self._extract_soup(BeautifulSoup(html_content, 'html.parser', parse_only=_PAGE_STRAINER))
+        if engine == "html.parser":
+            return self._extract_soup(BeautifulSoup(html_content, 'html.parser'))
+        raise ValueError(f"Engine must be one of: {', '.join(PARSER_ENGINES)}")
+
+    def parse(self, html_content: str, engine: Optional[str] = None) -> List[ScrapedField]:
+        """
+        Parse HTML content and extract Cardmarket price information.
+        
+        Args:
+            html_content: Raw HTML string
+            engine: Parser engine ('lxml', 'strainer' or 'html.parser'), defaults to PARSER_ENGINE
             
-            results.append(ScrapedField(
-                name="card_rarity",
-                value=rarity_value,
-                field_type=DataType.STRING,
-                description="Rarity of the card",
-                #accumulate=True
-            ))
+        Returns:
+            List of ScrapedField objects with price data
+        """
+        return [
+            ScrapedField(name=name, value=value, field_type=self._field_type(name, value),
+                         description=_FIELD_DESCRIPTIONS[name])
+            for name, value in self.parse_values(html_content, engine).items()
+        ]
+
+    def _field_type(self, name: str, value: Any) -> DataType:
+        if name in _PRICE_FIELDS:
+            return DataType.FLOAT if self.STORE_PRICES_AS_FLOAT else DataType.STRING
+        if name == "available_items":
+            return DataType.INTEGER if isinstance(value, int) else DataType.STRING
+        return DataType.STRING
+
+    def parse_values(self, html_content: str, engine: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Same fields as parse(), but as a plain {name: value} dict without ScrapedField objects.
+        This is what parse_many() sends back from the worker processes.
+        """
+        title, pairs, rarity = self.extract(html_content, engine)
+        values = {}
+        
+        # Extract card name and set
+        if title:
+            h1_text, span_text = title
+            # Extract main card name (text before the span)
+            card_name = h1_text.strip().replace(span_text, '').strip()
+            card_set = span_text.strip()
+
+            values["card_name"] = card_name
+            values["card_set"] = card_set
+
+        if not pairs:
+            # No info list on the page, return what we have so far
+            return values
+        
+        # Create a dictionary to map field keys to values
+        price_data = dict(pairs)
+        
+        # Extract card rarity
+        if "Rarity" in price_data:
+            values["card_rarity"] = rarity if rarity is not None else "Unknown"
         
         # Extract card number
         number_value = None
@@ -268,13 +365,7 @@ class CardmarketPricePlugin:
                 break
         
         if number_value:
-            results.append(ScrapedField(
-                name="card_number",
-                value=number_value,
-                field_type=DataType.STRING,
-                description="Card number in the set",
-                #accumulate=True
-            ))
+            values["card_number"] = number_value
         
         # Extract available items
         available_items_value = None
@@ -289,13 +380,7 @@ class CardmarketPricePlugin:
                 break
         
         if available_items_value is not None:
-            results.append(ScrapedField(
-                name="available_items",
-                value=available_items_value,
-                field_type=DataType.INTEGER if isinstance(available_items_value, int) else DataType.STRING,
-                description="Number of available items for sale",
-                #accumulate=True
-            ))
+            values["available_items"] = available_items_value
         
         # Extract lowest price
         lowest_price = None
@@ -309,13 +394,7 @@ class CardmarketPricePlugin:
                 break
         
         if lowest_price is not None:
-            results.append(ScrapedField(
-                name="lowest_price",
-                value=lowest_price,
-                field_type=DataType.FLOAT if self.STORE_PRICES_AS_FLOAT else DataType.STRING,
-                description="Lowest price available for the card",
-                #accumulate=True
-            ))
+            values["lowest_price"] = lowest_price
         
         # Extract price trend
         price_trend = None
@@ -329,13 +408,7 @@ class CardmarketPricePlugin:
                 break
         
         if price_trend is not None:
-            results.append(ScrapedField(
-                name="price_trend",
-                value=price_trend,
-                field_type=DataType.FLOAT if self.STORE_PRICES_AS_FLOAT else DataType.STRING,
-                description="Price trend of the card",
-                #accumulate=True
-            ))
+            values["price_trend"] = price_trend
         
         # Extract 30-day average
         avg_30_days = None
@@ -349,13 +422,7 @@ class CardmarketPricePlugin:
                 break
         
         if avg_30_days is not None:
-            results.append(ScrapedField(
-                name="avg_30_days",
-                value=avg_30_days,
-                field_type=DataType.FLOAT if self.STORE_PRICES_AS_FLOAT else DataType.STRING,
-                description="Average price over the last 30 days",
-                #accumulate=True
-            ))
+            values["avg_30_days"] = avg_30_days
         
         # Extract 7-day average
         avg_7_days = None
@@ -369,13 +436,7 @@ class CardmarketPricePlugin:
                 break
         
         if avg_7_days is not None:
-            results.append(ScrapedField(
-                name="avg_7_days",
-                value=avg_7_days,
-                field_type=DataType.FLOAT if self.STORE_PRICES_AS_FLOAT else DataType.STRING,
-                description="Average price over the last 7 days",
-                #accumulate=True
-            ))
+            values["avg_7_days"] = avg_7_days
         
         # Extract 1-day average
         avg_1_day = None
@@ -389,13 +450,7 @@ class CardmarketPricePlugin:
                 break
         
         if avg_1_day is not None:
-            results.append(ScrapedField(
-                name="avg_1_day",
-                value=avg_1_day,
-                field_type=DataType.FLOAT if self.STORE_PRICES_AS_FLOAT else DataType.STRING,
-                description="Average price over the last day",
-                #accumulate=True
-            ))
+            values["avg_1_day"] = avg_1_day
         
         # Extract card expansion (though we already got it from the title)
         card_expansion = None
@@ -405,12 +460,20 @@ class CardmarketPricePlugin:
                 break
         
         if card_expansion:
-            results.append(ScrapedField(
-                name="card_expansion",
-                value=card_expansion,
-                field_type=DataType.STRING,
-                description="Expansion/set the card belongs to",
-                #accumulate=True
-            ))
+            values["card_expansion"] = card_expansion
         
-        return results
\ No newline at end of file
+        return values
+
+
+def extract_field(html_content: str, field_name: str = "avg_7_days") -> Any:
+    """
+    Parse a product page and return the value of one field (None if the page does not have it).
+
+    Module-level so it can be sent to a process pool (see fetch_pipeline.fetch_and_parse).
+    """
+    value = None
+    for name, field_value in CardmarketPricePlugin().parse_values(html_content).items():
+        # Preisdaten hier anpassbar (avg, low, trend, ...)
+        if field_name in name.lower():
+            value = field_value
+    return value
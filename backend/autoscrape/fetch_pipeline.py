@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+# Defaults for Cardmarket: a few pages in flight, but no more than about one request per second
+# per host on average (short bursts allowed), otherwise the site starts answering with challenges.
+FETCH_CONCURRENCY = 4
+HOST_RATE = 1.0
+HOST_BURST = 3
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens per second, at most `burst` saved up."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # The lock makes waiters take tokens in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host, created on first use."""
+
+    def __init__(self, rate: float = HOST_RATE, burst: int = HOST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def acquire(self, url: str) -> None:
+        host = urlsplit(url).netloc.lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        await bucket.acquire()
+
+
+class FetchResult(NamedTuple):
+    """Outcome for one job: the parsed value, or the exception raised while fetching/parsing."""
+    index: int
+    url: str
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+async def fetch_and_parse(
+    urls: Iterable[str],
+    fetch: Callable[[str], Awaitable[str]],
+    parse: Callable[[str], Any],
+    concurrency: int = FETCH_CONCURRENCY,
+    rate: float = HOST_RATE,
+    burst: int = HOST_BURST,
+    parse_workers: Optional[int] = None,
+    executor=None,
+    cached: Optional[Callable[[str], Optional[str]]] = None,
+):
+    """
+    Fetch all URLs concurrently and parse the pages in a process pool.
+
+    Results are yielded in input order as soon as they (and all earlier ones) are done, so
+    callers can write output progressively. At most `concurrency` fetches run at the same time,
+    each host is limited to `rate` requests per second, and no more than a small window of
+    finished results is buffered ahead of the slowest pending one.
+
+    Args:
+        urls: URLs to fetch, in output order
+        fetch: Coroutine function returning the HTML for a URL ("" if the page could not be loaded)
+        parse: Picklable function turning HTML into a result value; runs in a worker process
+        concurrency: Maximum number of simultaneous fetches
+        rate: Requests per second per host
+        burst: Requests a host may receive back-to-back before the rate applies
+        parse_workers: Size of the parse process pool (defaults to the CPU count)
+        executor: Existing executor to parse in instead of creating a process pool
+        cached: Optional lookup returning the HTML without a request (e.g. TieredFetcher.cached);
+            hits skip the concurrency limit and the rate limiter
+
+    Yields:
+        FetchResult for every URL, in input order
+    """
+    loop = asyncio.get_running_loop()
+    limiter = HostRateLimiter(rate, burst)
+    slots = asyncio.Semaphore(concurrency)
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=parse_workers)
+
+    async def run(index: int, url: str) -> FetchResult:
+        try:
+            html = cached(url) if cached is not None else None
+            if html is None:
+                async with slots:
+                    await limiter.acquire(url)
+                    html = await fetch(url)
+            value = await loop.run_in_executor(executor, parse, html)
+            return FetchResult(index, url, value)
+        except Exception as e:
+            return FetchResult(index, url, error=e)
+
+    window = max(concurrency * 4, 1)
+    pending: deque = deque()
+    jobs = enumerate(urls)
+    try:
+        for index, url in jobs:
+            pending.append(asyncio.ensure_future(run(index, url)))
+            if len(pending) >= window:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
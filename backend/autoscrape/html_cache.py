@@ -0,0 +1,144 @@
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+HTML_CACHE_PATH = pathlib.Path(__file__).resolve().parents[2] / "cache" / "html"
+HTML_CACHE_TTL = 24 * 3600  # seconds
+HTML_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache keys: lower-case scheme and host, no fragment, no trailing
+    slash, query parameters sorted. All parameters are kept, so language=… and isReverseHolo=…
+    variants of the same product stay separate entries.
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=False)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class HtmlCache:
+    """
+    On-disk cache of fetched HTML, keyed by the SHA-1 of the normalized URL.
+
+    Every entry is a gzip file plus a small JSON sidecar with URL, fetch time and expiry, so each
+    entry can have its own TTL. When the cache grows beyond `max_bytes`, the least recently used
+    entries are evicted. Expired entries are still returned with `allow_stale=True` (replay mode).
+
+    Args:
+        path: Cache directory (default: cache/html in the repository)
+        ttl: Default time to live in seconds for put()
+        max_bytes: Size limit for the compressed pages
+    """
+
+    def __init__(self, path=HTML_CACHE_PATH, ttl: float = HTML_CACHE_TTL, max_bytes: int = HTML_CACHE_MAX_BYTES):
+        self.path = pathlib.Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.stale = self.evictions = 0
+        # key -> (size, last use); filled from disk once, then kept up to date
+        self._entries: Dict[str, list] = {}
+        self._total = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        for meta_path in self.path.glob("*/*.json"):
+            key = meta_path.stem
+            try:
+                st = (self.path / key[:2] / f"{key}.html.gz").stat()
+            except FileNotFoundError:
+                continue
+            self._entries[key] = [st.st_size, st.st_mtime]
+            self._total += st.st_size
+
+    def _paths(self, key: str):
+        folder = self.path / key[:2]
+        return folder / f"{key}.html.gz", folder / f"{key}.json"
+
+    def get(self, url: str, allow_stale: bool = False) -> Optional[str]:
+        """Cached HTML for the URL, or None if missing (or expired, unless allow_stale)."""
+        key = cache_key(url)
+        html_path, meta_path = self._paths(key)
+        try:
+            with meta_path.open("r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["expires"] < time.time() and not allow_stale:
+                with self._lock:
+                    self.stale += 1
+                return None
+            with gzip.open(html_path, "rt", encoding="utf-8") as f:
+                html = f.read()
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                self._entries[key][1] = now
+        # Last use for LRU eviction across runs
+        try:
+            os.utime(html_path, (now, now))
+        except OSError:
+            pass
+        return html
+
+    def put(self, url: str, html: str, ttl: Optional[float] = None) -> None:
+        key = cache_key(url)
+        html_path, meta_path = self._paths(key)
+        html_path.parent.mkdir(exist_ok=True)
+        now = time.time()
+        meta = {"url": normalize_url(url), "fetched": now, "expires": now + (self.ttl if ttl is None else ttl)}
+        # Written under a temporary name first so readers never see half a page
+        tmp_path = html_path.with_name(f"{html_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(html)
+        size = tmp_path.stat().st_size
+        os.replace(tmp_path, html_path)
+        with meta_path.open("w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        with self._lock:
+            old = self._entries.get(key)
+            self._total += size - (old[0] if old else 0)
+            self._entries[key] = [size, now]
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Caller holds the lock; drop least recently used entries down to 90 % of the limit
+        target = self.max_bytes * 0.9
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total <= target:
+                break
+            for path in self._paths(key):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            del self._entries[key]
+            self._total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,169 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # optional, falls back to BeautifulSoup with a SoupStrainer
+    etree = lxml_html = None
+
+CARDMARKET_BASE_URL = "https://www.cardmarket.com"
+PAGE_DELAY = 1.0  # seconds between two overview page requests
+
+# Product rows of a set overview (".../Products/Singles/<set>?site=N"); older pages used id="rowN"
+_ROW_ID = re.compile(r"^(productRow|row)")
+_ROW_STRAINER = SoupStrainer("div", id=_ROW_ID)
+
+
+def _has_classes(*names: str) -> str:
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names)
+
+
+_ROW_XPATH = (
+    f"//div[{_has_classes('table', 'table-striped', 'mb-3')}]"
+    f"//div[{_has_classes('row', 'g-0')} and (starts-with(@id, 'productRow') or starts-with(@id, 'row'))]"
+)
+_NUMBER_XPATH = f".//div[{_has_classes('col-md-2')}]"
+_PRICE_XPATH = f".//div[{_has_classes('col-price', 'pe-sm-2')}]"
+_PRICE_REV_XPATH = f".//div[{_has_classes('col-price', 'd-lg-flex')}]"
+
+
+class OverviewRow(NamedTuple):
+    """One card row of a Cardmarket set overview page."""
+    number: str  # collector number without leading zeros
+    name: str
+    url: str
+    price: Optional[float]  # "From" price, normal
+    price_rev: Optional[float]  # "From" price, reverse holo
+    promo: bool
+
+
+def _parse_price(text: Optional[str]) -> Optional[float]:
+    try:
+        return float(text.replace("€", "").replace(",", ".").strip())
+    except Exception:
+        return None
+
+
+def _row_record(aria_labels: List[str], text: str, href: Optional[str], link_text: str,
+                number_text: Optional[str], price_text: Optional[str], price_rev_text: Optional[str]
+                ) -> Optional[OverviewRow]:
+    # Code cards (online/live codes) are not collectible cards
+    if "Online Code Card" in aria_labels or "Live Code Card" in text:
+        return None
+    if href is None or number_text is None:
+        return None
+    number = number_text.strip().lstrip("0")
+    if not number.isdigit():
+        return None
+    return OverviewRow(
+        number=number,
+        name=link_text.strip(),
+        url=CARDMARKET_BASE_URL + href,
+        price=_parse_price(price_text),
+        price_rev=_parse_price(price_rev_text),
+        promo="Promo" in aria_labels,
+    )
+
+
+def _first_text(row, xpath: str) -> Optional[str]:
+    found = row.xpath(xpath)
+    return found[0].text_content() if found else None
+
+
+def _iter_rows_lxml(html: str) -> Iterator[OverviewRow]:
+    try:
+        root = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        root = lxml_html.fromstring(html.encode("utf-8"))
+    for row in root.xpath(_ROW_XPATH):
+        links = row.xpath(".//a[contains(@href, '/Products/')]")
+        record = _row_record(
+            aria_labels=[svg.get("aria-label", "") for svg in row.xpath(".//svg[@aria-label]")],
+            text=row.text_content(),
+            href=links[0].get("href") if links else None,
+            link_text=links[0].text_content() if links else "",
+            number_text=_first_text(row, _NUMBER_XPATH),
+            price_text=_first_text(row, _PRICE_XPATH),
+            price_rev_text=_first_text(row, _PRICE_REV_XPATH),
+        )
+        if record is not None:
+            yield record
+
+
+def _iter_rows_soup(html: str) -> Iterator[OverviewRow]:
+    # Only the product rows are built; the surrounding table is implied by the row ids
+    soup = BeautifulSoup(html, "html.parser", parse_only=_ROW_STRAINER)
+    for row in soup.find_all("div", id=_ROW_ID, class_="g-0"):
+        if "row" not in row.get("class", []):
+            continue
+        link = row.select_one('a[href*="/Products/"]')
+        number_div = row.select_one("div.col-md-2")
+        price_div = row.select_one("div.col-price.pe-sm-2")
+        price_rev_div = row.select_one("div.col-price.d-lg-flex")
+        record = _row_record(
+            aria_labels=[svg.get("aria-label", "") for svg in row.select("svg[aria-label]")],
+            text=row.text,
+            href=link["href"] if link else None,
+            link_text=link.text if link else "",
+            number_text=number_div.text if number_div else None,
+            price_text=price_div.text if price_div else None,
+            price_rev_text=price_rev_div.text if price_rev_div else None,
+        )
+        if record is not None:
+            yield record
+
+
+def iter_overview_rows(html: str) -> Iterator[OverviewRow]:
+    """
+    Lazily yields the card rows of one overview page, skipping code cards and rows without a
+    numeric collector number. Uses lxml when available, otherwise html.parser restricted to the rows.
+    """
+    if not html:
+        return iter(())
+    if lxml_html is not None:
+        return _iter_rows_lxml(html)
+    return _iter_rows_soup(html)
+
+
+def iter_overview_pages(
+    set_url_base: str,
+    fetch: Callable[[str], str],
+    max_pages: int = 20,
+    delay: float = PAGE_DELAY,
+) -> Iterator[Tuple[int, List[OverviewRow]]]:
+    """
+    Yields (page number, rows) for the pages of a set overview until a page has no rows.
+
+    While the caller processes page N, page N+1 is already being fetched in a background thread
+    (at most `delay` seconds after the previous request started), so fetch and processing overlap.
+
+    Args:
+        set_url_base: Overview URL without the site parameter
+        fetch: Blocking function returning the HTML for a URL
+        max_pages: Upper bound for the number of pages
+        delay: Minimum seconds between the starts of two page requests
+    """
+    last_start = [0.0]
+
+    def fetch_page(page: int) -> str:
+        wait = last_start[0] + delay - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        last_start[0] = time.monotonic()
+        return fetch(f"{set_url_base}&site={page}")
+
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending = prefetcher.submit(fetch_page, 1)
+        for page in range(1, max_pages + 1):
+            rows = list(iter_overview_rows(pending.result()))
+            # An empty page ends the listing, so only fetch ahead when this one had rows
+            if rows and page < max_pages:
+                pending = prefetcher.submit(fetch_page, page + 1)
+            yield page, rows
+            if not rows:
+                break
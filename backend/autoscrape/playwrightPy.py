@@ -1,12 +1,518 @@
 import asyncio
+import atexit
 import random
 import os
 import sys
+import threading
+import time
+import weakref
 from typing import Optional, Dict, Any, List
 import pathlib
+from urllib.parse import urlsplit
 
 DEFAULT_USER_AGENT_PATH = str(pathlib.Path(__file__).parent / "user-agents.txt")
 
+VALID_ENGINES = ['playwright', 'playwright-stealth', 'puppeteer-compat']
+STEALTH_ENGINES = ['playwright-stealth', 'puppeteer-compat']
+
+# Recycling limits: a context (and with it the user agent) is replaced after this many pages,
+# the whole browser process after BROWSER_MAX_PAGES to keep Chromium memory growth in check.
+PAGES_PER_CONTEXT = 25
+BROWSER_MAX_PAGES = 500
+
+STEALTH_SCRIPT = """
+    // Overwrite the webdriver property
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => false,
+    });
+
+    // Overwrite plugins array
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => {
+            return [{
+                0: {
+                    type: 'application/x-google-chrome-pdf',
+                    description: 'Portable Document Format'
+                },
+                name: 'Chrome PDF Plugin',
+                filename: 'internal-pdf-viewer',
+                description: 'Portable Document Format'
+            }];
+        },
+    });
+
+    // Overwrite languages
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en'],
+    });
+
+    // Overwrite permissions
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({state: Notification.permission}) :
+            originalQuery(parameters)
+    );
+"""
+
+STEALTH_HEADERS = {
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+}
+
+
+class ResourcePolicy:
+    """
+    Allow-list for requests made while loading a page, applied through route interception.
+
+    A request is let through only if its resource type is in `allowed_types` and its host is one of
+    `allowed_domains` (or a subdomain of one). Everything else (images, fonts, CSS, media,
+    third-party scripts and trackers) is aborted before it is downloaded.
+    """
+
+    def __init__(self, allowed_types=("document", "script", "xhr", "fetch"),
+                 allowed_domains=("cardmarket.com", "cloudflare.com")):
+        self.allowed_types = frozenset(allowed_types)
+        self.allowed_domains = tuple(domain.lower() for domain in allowed_domains)
+
+    def allows(self, resource_type: str, url: str) -> bool:
+        if resource_type not in self.allowed_types:
+            return False
+        host = (urlsplit(url).hostname or "").lower()
+        return any(host == domain or host.endswith("." + domain) for domain in self.allowed_domains)
+
+
+# We only read the HTML (.info-list-container, product rows); scripts from Cardmarket itself and
+# Cloudflare stay allowed so that pages and challenges still render.
+DEFAULT_RESOURCE_POLICY = ResourcePolicy()
+
+
+class _ContextSlot:
+    """One pooled browser context together with the number of pages it has served."""
+
+    def __init__(self):
+        self.context = None
+        self.pages = 0
+
+
+class ScraperSession:
+    """
+    Long-lived Playwright session that keeps one Chromium process and a pool of browser contexts.
+
+    Starting Playwright and launching Chromium costs far more than loading a single page, so the
+    session does it once and reuses it for every URL. Each context gets a random user agent and is
+    replaced after `pages_per_context` pages (user-agent rotation); the browser itself is relaunched
+    after `browser_max_pages` pages. `pool_size` contexts can load pages concurrently.
+
+    Usage:
+        async with ScraperSession(engine='playwright-stealth') as session:
+            html = await session.fetch(url)
+    """
+
+    def __init__(
+        self,
+        engine: str = 'playwright',
+        headless: bool = True,
+        timeout: int = 30000,
+        user_agents_file: str = DEFAULT_USER_AGENT_PATH,
+        simulate_human: bool = True,
+        pool_size: int = 1,
+        pages_per_context: int = PAGES_PER_CONTEXT,
+        browser_max_pages: int = BROWSER_MAX_PAGES,
+        resource_policy: Optional[ResourcePolicy] = None,
+        human_sleep_scale: float = 1.0,
+    ):
+        if engine not in VALID_ENGINES:
+            raise ValueError(f"Engine must be one of: {', '.join(VALID_ENGINES)}")
+        self.engine = engine
+        self.headless = headless
+        self.timeout = timeout
+        self.simulate_human = simulate_human
+        self.pool_size = pool_size
+        self.pages_per_context = pages_per_context
+        self.browser_max_pages = browser_max_pages
+        self.resource_policy = resource_policy
+        # 1.0 = normal pauses during human simulation, 0 skips them (trusted runs)
+        self.human_sleep_scale = human_sleep_scale
+        self.user_agents = _load_user_agents(user_agents_file)
+
+        self.pages_served = 0
+        self.browser_launches = 0
+        self.context_launches = 0
+        self.requests_blocked = 0
+        self.bytes_received = 0
+        self.page_seconds = 0.0
+
+        self._playwright = None
+        self._browser = None
+        self._browser_pages = 0
+        self._slots: Optional[asyncio.Queue] = None
+        self._lock: Optional[asyncio.Lock] = None
+        # Concurrent first fetches must share one Playwright driver and browser
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def stealth(self) -> bool:
+        return self.engine in STEALTH_ENGINES
+
+    async def start(self) -> "ScraperSession":
+        """Start Playwright and launch the browser. Called automatically by fetch()."""
+        async with self._start_lock:
+            if self._playwright is not None:
+                return self
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Queue()
+            for _ in range(self.pool_size):
+                self._slots.put_nowait(_ContextSlot())
+            self._playwright = await self._start_driver()
+            try:
+                await self._launch_browser()
+            except BaseException:
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+        return self
+
+    async def _start_driver(self):
+        from playwright.async_api import async_playwright
+        return await async_playwright().start()
+
+    async def close(self) -> None:
+        """Close all contexts, the browser and Playwright."""
+        if self._playwright is None:
+            return
+        if self._slots is not None:
+            while not self._slots.empty():
+                await self._close_context(self._slots.get_nowait())
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        await self._playwright.stop()
+        self._playwright = None
+
+        # Force cleanup for visible browser to make sure it closes
+        if not self.headless:
+            import gc
+            gc.collect()
+
+    async def __aenter__(self) -> "ScraperSession":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _launch_browser(self) -> None:
+        launch_options: Dict[str, Any] = {"headless": self.headless}
+        # Add stealth-specific options
+        if self.stealth:
+            launch_options["args"] = [
+                '--disable-blink-features=AutomationControlled',
+                '--disable-features=IsolateOrigins,site-per-process',
+                '--disable-site-isolation-trials',
+            ]
+        self._browser = await self._playwright.chromium.launch(**launch_options)
+        self._browser_pages = 0
+        self.browser_launches += 1
+
+    async def _recycle_browser(self) -> None:
+        # Only called while no context is checked out (all slots are in the queue)
+        old_browser = self._browser
+        await self._launch_browser()
+        await old_browser.close()
+
+    async def _new_context(self, slot: _ContextSlot) -> None:
+        context_options: Dict[str, Any] = {
+            "viewport": {'width': 1920, 'height': 1080},
+            "user_agent": random.choice(self.user_agents),
+        }
+        if self.stealth:
+            context_options.update({
+                "java_script_enabled": True,
+                "bypass_csp": True,
+                "extra_http_headers": STEALTH_HEADERS,
+            })
+        slot.context = await self._browser.new_context(**context_options)
+        # Applied to the context so every page created from it gets the script
+        if self.stealth:
+            await slot.context.add_init_script(STEALTH_SCRIPT)
+        if self.resource_policy is not None:
+            await slot.context.route("**/*", self._route)
+        slot.context.on("requestfinished", self._count_bytes)
+        slot.pages = 0
+        self.context_launches += 1
+
+    async def _route(self, route) -> None:
+        request = route.request
+        if self.resource_policy.allows(request.resource_type, request.url):
+            await route.continue_()
+        else:
+            self.requests_blocked += 1
+            await route.abort()
+
+    async def _count_bytes(self, request) -> None:
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            # Page or context already closed
+            return
+        self.bytes_received += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+    async def _close_context(self, slot: _ContextSlot) -> None:
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+            slot.context = None
+
+    async def _acquire(self) -> _ContextSlot:
+        # Slots are taken under the lock, so a recycle can wait for the others without racing new fetches
+        async with self._lock:
+            slot = await self._slots.get()
+            held = [slot]
+            try:
+                if self._browser_pages >= self.browser_max_pages:
+                    # Drain: wait until the running fetches have returned their slots, then relaunch the browser
+                    while len(held) < self.pool_size:
+                        held.append(await self._slots.get())
+                    for other in held:
+                        await self._close_context(other)
+                    await self._recycle_browser()
+                if slot.context is not None and slot.pages >= self.pages_per_context:
+                    await self._close_context(slot)
+                if slot.context is None:
+                    await self._new_context(slot)
+            except BaseException:
+                # A half set-up context is not reused; give every held slot back, otherwise later
+                # fetches wait for it forever
+                await self._close_context(slot)
+                for other in held:
+                    self._slots.put_nowait(other)
+                raise
+            for other in held[1:]:
+                self._slots.put_nowait(other)
+            self._browser_pages += 1
+        return slot
+
+    async def fetch(
+        self,
+        url: str,
+        timeout: Optional[int] = None,
+        output_file: Optional[str] = None,
+        simulate_human: Optional[bool] = None,
+    ) -> str:
+        """
+        Load a URL in a pooled context and return its HTML.
+
+        Args:
+            url (str): The URL to scrape
+            timeout (int): Timeout in milliseconds, defaults to the session timeout
+            output_file (str): Optional path to save the HTML output
+            simulate_human (bool): Override the session's human behavior simulation
+
+        Returns:
+            str: The HTML content of the page, or "" if loading failed
+        """
+        await self.start()
+        timeout = self.timeout if timeout is None else timeout
+        simulate_human = self.simulate_human if simulate_human is None else simulate_human
+
+        try:
+            slot = await self._acquire()
+        except Exception as e:
+            print(f"Error accessing {url}: {str(e)}")
+            return ""
+        page = None
+        started = time.perf_counter()
+        try:
+            page = await slot.context.new_page()
+            slot.pages += 1
+            self.pages_served += 1
+
+            # Navigate to the page with timeout
+            response = await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+            await page.wait_for_selector("a[href*='/en/Pokemon/Products/Singles/']", timeout=timeout)
+
+            if not response:
+                print(f"Failed to load {url}: No response")
+                return ""
+
+            if response.status >= 400:
+                print(f"Failed to load {url}: Status code {response.status}")
+                return ""
+
+            # Wait to ensure page is fully loaded
+            await page.wait_for_load_state("domcontentloaded")
+
+            # Simulate human behavior if enabled
+            if simulate_human and self.stealth:  # Only for advanced modes
+                await _simulate_human_behavior(page, self.human_sleep_scale)
+
+            # Important: Get the HTML content
+            html = await page.content()
+
+            # Save to output file if specified
+            if output_file:
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(html)
+                print(f"HTML saved to {output_file}")
+
+            return html
+
+        except Exception as e:
+            print(f"Error accessing {url}: {str(e)}")
+            # The context may be blocked or broken, start the next page with a fresh one
+            slot.pages = self.pages_per_context
+            return ""
+        finally:
+            self.page_seconds += time.perf_counter() - started
+            if page:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            self._slots.put_nowait(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        pages = max(self.pages_served, 1)
+        return {
+            "pages": self.pages_served,
+            "browser_launches": self.browser_launches,
+            "context_launches": self.context_launches,
+            "requests_blocked": self.requests_blocked,
+            "bytes_received": self.bytes_received,
+            "bytes_per_page": self.bytes_received // pages,
+            "seconds_per_page": round(self.page_seconds / pages, 3),
+        }
+
+
+class SyncScraperSession:
+    """
+    Blocking facade over ScraperSession for synchronous callers.
+
+    The async session lives on a private event loop in a daemon thread, so the browser stays up
+    between calls instead of creating a fresh event loop and Chromium for every URL.
+    """
+
+    def __init__(self, **session_options):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="playwright-session", daemon=True)
+        self._thread.start()
+        self.session = ScraperSession(**session_options)
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fetch(self, url: str, **options) -> str:
+        return self._run(self.session.fetch(url, **options))
+
+    def stats(self) -> Dict[str, Any]:
+        return self.session.stats()
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            self._run(self.session.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def __enter__(self) -> "SyncScraperSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+# Shared sessions behind the function wrappers, one per browser configuration (and event loop)
+_sync_sessions: Dict[tuple, SyncScraperSession] = {}
+_async_sessions = weakref.WeakKeyDictionary()  # event loop -> {configuration: ScraperSession}
+_loop_closers = weakref.WeakKeyDictionary()  # event loop -> its _close_with_loop() generator
+_sessions_lock = threading.Lock()
+
+
+def get_sync_session(
+    engine: str = 'playwright',
+    headless: bool = True,
+    user_agents_file: str = DEFAULT_USER_AGENT_PATH,
+    resource_policy: Optional[ResourcePolicy] = None,
+) -> SyncScraperSession:
+    """Return the shared blocking session for this configuration, starting it on first use."""
+    key = (engine, headless, user_agents_file, id(resource_policy))
+    with _sessions_lock:
+        session = _sync_sessions.get(key)
+        if session is None:
+            session = _sync_sessions[key] = SyncScraperSession(
+                engine=engine, headless=headless, user_agents_file=user_agents_file,
+                resource_policy=resource_policy)
+        return session
+
+
+def close_sync_sessions() -> None:
+    """Close all shared blocking sessions (also registered with atexit)."""
+    with _sessions_lock:
+        sessions = list(_sync_sessions.values())
+        _sync_sessions.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception as e:
+            print(f"Error closing scraper session: {str(e)}")
+
+
+atexit.register(close_sync_sessions)
+
+
+async def close_async_sessions() -> None:
+    """
+    Close the shared async sessions of the running event loop.
+
+    Runs automatically when asyncio.run() shuts the loop down; only needed for loops that are
+    closed without shutdown_asyncgens().
+    """
+    closer = _loop_closers.pop(asyncio.get_running_loop(), None)
+    if closer is not None:
+        await closer.aclose()
+
+
+async def _close_with_loop(sessions: Dict[tuple, ScraperSession]):
+    # Registered with the loop by its first step, so the loop's shutdown_asyncgens() (part of
+    # asyncio.run) closes it while the loop can still await the browser shutdown
+    try:
+        yield
+    finally:
+        loop = asyncio.get_running_loop()
+        _loop_closers.pop(loop, None)
+        if _async_sessions.get(loop) is sessions:
+            del _async_sessions[loop]
+        for session in sessions.values():
+            try:
+                await session.close()
+            except Exception as e:
+                print(f"Error closing scraper session: {str(e)}")
+
+
+async def _loop_sessions() -> Dict[tuple, ScraperSession]:
+    loop = asyncio.get_running_loop()
+    sessions = _async_sessions.get(loop)
+    if sessions is None:
+        sessions = _async_sessions[loop] = {}
+        # The loop only tracks async generators weakly, so keep a reference until it is closed
+        closer = _loop_closers[loop] = _close_with_loop(sessions)
+        await closer.__anext__()
+    return sessions
+
+
 async def scrape_with_playwright(
     url: str, 
     engine: str = 'playwright', 
@@ -14,10 +520,14 @@ async def scrape_with_playwright(
     timeout: int = 30000, 
     output_file: Optional[str] = None,
     user_agents_file: str = DEFAULT_USER_AGENT_PATH,
-    simulate_human: bool = True
+    simulate_human: bool = True,
+    resource_policy: Optional[ResourcePolicy] = None,
 ) -> str:
     """
     Scrape a URL using Playwright with multiple engine configurations.
+
+    Thin wrapper over a ScraperSession shared per event loop and configuration. The sessions
+    are closed when asyncio.run() shuts the loop down (or by close_async_sessions()).
     
     Args:
         url (str): The URL to scrape
@@ -27,166 +537,19 @@ async def scrape_with_playwright(
         output_file (str): Optional path to save the HTML output
         user_agents_file (str): Path to file containing user agents
         simulate_human (bool): Whether to simulate human behavior
+        resource_policy (ResourcePolicy): Block requests not allowed by this policy (None loads everything)
         
     Returns:
         str: The HTML content of the page
     """
-    from playwright.async_api import async_playwright
-    #print(f"Using user agents from: {user_agents_file}")
-
-    # Validate engine choice
-    valid_engines = ['playwright', 'playwright-stealth', 'puppeteer-compat']
-    if engine not in valid_engines:
-        raise ValueError(f"Engine must be one of: {', '.join(valid_engines)}")
-    
-    #print(f"Scraping {url} with {engine} engine")
-    
-    # Load user agents
-    user_agents = _load_user_agents(user_agents_file)
-    user_agent = random.choice(user_agents)
-    
-    html = ""
-    
-    # Initialize resources
-    p = await async_playwright().start()
-    browser = None
-    context = None
-    page = None
-    
-    try:
-        # Configure browser launch options based on engine
-        launch_options = {
-            "headless": headless,
-        }
-        
-        # Add stealth-specific options
-        if engine in ['playwright-stealth', 'puppeteer-compat']:
-            launch_options["args"] = [
-                '--disable-blink-features=AutomationControlled',
-                '--disable-features=IsolateOrigins,site-per-process',
-                '--disable-site-isolation-trials',
-            ]
-        
-        # Launch browser
-        browser = await p.chromium.launch(**launch_options)
-        
-        # Create browser context with options
-        context_options = {
-            "viewport": {'width': 1920, 'height': 1080},
-            "user_agent": user_agent,
-        }
-        
-        # Add stealth-specific context options
-        if engine in ['playwright-stealth', 'puppeteer-compat']:
-            context_options.update({
-                "java_script_enabled": True,
-                "bypass_csp": True,
-                "extra_http_headers": {
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Sec-Fetch-User': '?1',
-                    'Cache-Control': 'max-age=0',
-                }
-            })
-        
-        context = await browser.new_context(**context_options)
-        
-        # Apply stealth script for more advanced protection
-        if engine in ['playwright-stealth', 'puppeteer-compat']:
-            stealth_page = await context.new_page()
-            await stealth_page.add_init_script("""
-                // Overwrite the webdriver property
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => false,
-                });
-                
-                // Overwrite plugins array
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => {
-                        return [{
-                            0: {
-                                type: 'application/x-google-chrome-pdf',
-                                description: 'Portable Document Format'
-                            },
-                            name: 'Chrome PDF Plugin',
-                            filename: 'internal-pdf-viewer',
-                            description: 'Portable Document Format'
-                        }];
-                    },
-                });
-                
-                // Overwrite languages
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['en-US', 'en'],
-                });
-                
-                // Overwrite permissions
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({state: Notification.permission}) :
-                        originalQuery(parameters)
-                );
-            """)
-            await stealth_page.close()
-        
-        # Create a new page for the actual scraping
-        page = await context.new_page()
-        
-        # Navigate to the page with timeout
-        response = await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-        await page.wait_for_selector("a[href*='/en/Pokemon/Products/Singles/']", timeout=timeout)
-
-        
-        if not response:
-            print(f"Failed to load {url}: No response")
-            return ""
-            
-        if response.status >= 400:
-            print(f"Failed to load {url}: Status code {response.status}")
-            return ""
-        
-        # Wait to ensure page is fully loaded
-        await page.wait_for_load_state("domcontentloaded")
-        
-        # Simulate human behavior if enabled
-        if simulate_human and engine != 'playwright':  # Only for advanced modes
-            await _simulate_human_behavior(page)
-        
-        # Important: Get the HTML content
-        html = await page.content()
-        
-        # Save to output file if specified
-        if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html)
-            print(f"HTML saved to {output_file}")
-        
-        return html
-            
-    except Exception as e:
-        print(f"Error accessing {url}: {str(e)}")
-        return ""
-    finally:
-        # Critical: Make sure to close everything in the correct order
-        if page:
-            await page.close()
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        await p.stop()
-        
-        # Force exit for visible browser to make sure it closes
-        if not headless:
-            import gc
-            gc.collect()
+    sessions = await _loop_sessions()
+    key = (engine, headless, user_agents_file, id(resource_policy))
+    session = sessions.get(key)
+    if session is None:
+        session = sessions[key] = ScraperSession(
+            engine=engine, headless=headless, user_agents_file=user_agents_file,
+            resource_policy=resource_policy)
+    return await session.fetch(url, timeout=timeout, output_file=output_file, simulate_human=simulate_human)
 
 def scrape_with_playwright_sync(
     url: str, 
@@ -195,35 +558,27 @@ def scrape_with_playwright_sync(
     timeout: int = 30000, 
     output_file: Optional[str] = None,
     user_agents_file: str = DEFAULT_USER_AGENT_PATH,
-    simulate_human: bool = True
+    simulate_human: bool = True,
+    resource_policy: Optional[ResourcePolicy] = None,
 ) -> str:
     """
     Synchronous wrapper for scrape_with_playwright.
     
     This function has the same interface as scrape_with_js to make it easy
-    to replace in existing code.
+    to replace in existing code. The browser is kept alive between calls (see get_sync_session).
     """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(scrape_with_playwright(
-            url=url,
-            engine=engine,
-            headless=headless,
-            timeout=timeout,
-            output_file=output_file,
-            user_agents_file=user_agents_file,
-            simulate_human=simulate_human
-        ))
-        return result
-    finally:
-        loop.close()
+    session = get_sync_session(engine, headless, user_agents_file, resource_policy)
+    return session.fetch(url, timeout=timeout, output_file=output_file, simulate_human=simulate_human)
+
+async def _human_pause(seconds: float, scale: float) -> None:
+    if scale > 0:
+        await asyncio.sleep(seconds * scale)
 
-async def _simulate_human_behavior(page) -> None:
-    """Simulate human-like behavior on the page."""
+async def _simulate_human_behavior(page, sleep_scale: float = 1.0) -> None:
+    """Simulate human-like behavior on the page. `sleep_scale` shortens (or with 0 skips) the pauses."""
     try:
         # Random delay between 1-2 seconds (shorter to avoid timeouts)
-        await asyncio.sleep(random.uniform(0.5, 1))
+        await _human_pause(random.uniform(0.5, 1), sleep_scale)
         
         # Get viewport and page dimensions
         viewport_height = await page.evaluate("window.innerHeight")
@@ -235,7 +590,7 @@ async def _simulate_human_behavior(page) -> None:
             # Scroll to position
             await page.evaluate(f"window.scrollTo(0, {position})")
             # Shorter pause
-            await asyncio.sleep(random.uniform(0.3, 0.7))
+            await _human_pause(random.uniform(0.3, 0.7), sleep_scale)
         
         # Optionally move mouse once
         if random.random() > 0.5:
@@ -244,7 +599,7 @@ async def _simulate_human_behavior(page) -> None:
             await page.mouse.move(x, y)
         
         # Final short delay
-        await asyncio.sleep(0.5)
+        await _human_pause(0.5, sleep_scale)
     except Exception as e:
         print(f"Error during human simulation: {str(e)}")
         # Continue execution even if human simulation fails
@@ -289,6 +644,25 @@ def scrape_with_js(
         output_file=output_file
     )
 
+async def compare_resource_policies(
+    urls: List[str],
+    engine: str = 'playwright-stealth',
+    headless: bool = True,
+    policy: ResourcePolicy = DEFAULT_RESOURCE_POLICY,
+    human_sleep_scale: float = 1.0,
+) -> Dict[str, Dict[str, Any]]:
+    """Load the same URLs without and with a resource policy and report bytes and latency per page."""
+    results = {}
+    for label, resource_policy in (("all resources", None), ("resource policy", policy)):
+        async with ScraperSession(engine=engine, headless=headless, resource_policy=resource_policy,
+                                  human_sleep_scale=human_sleep_scale) as session:
+            for url in urls:
+                await session.fetch(url)
+            results[label] = stats = session.stats()
+        print(f"{label:16} {stats['pages']} pages, {stats['bytes_per_page'] / 1024:.0f} KiB/page, "
+              f"{stats['seconds_per_page']:.2f} s/page, {stats['requests_blocked']} requests blocked")
+    return results
+
 # Example usage with more error handling
 if __name__ == "__main__":
     import argparse
@@ -302,19 +676,33 @@ if __name__ == "__main__":
     parser.add_argument('--timeout', '-t', type=int, default=30000, help='Timeout in milliseconds')
     parser.add_argument('--user-agents', '-u', default='user-agents.txt', help='Path to user agents file')
     parser.add_argument('--no-human', action='store_true', help='Disable human behavior simulation')
+    parser.add_argument('--block-resources', '-b', action='store_true',
+                      help='Skip images, fonts, CSS and third-party requests (DEFAULT_RESOURCE_POLICY)')
+    parser.add_argument('--human-sleep-scale', type=float, default=1.0,
+                      help='Scale the pauses of the human simulation (0 skips them)')
+    parser.add_argument('--compare', type=int, metavar='N',
+                      help='Load the URL N times without and with resource blocking and report bytes/latency')
     
     args = parser.parse_args()
+
+    if args.compare:
+        asyncio.run(compare_resource_policies([args.url] * args.compare, engine=args.engine,
+                                              headless=not args.visible,
+                                              human_sleep_scale=args.human_sleep_scale))
+        sys.exit(0)
     
     try:
-        html = scrape_with_playwright_sync(
-            url=args.url,
+        with SyncScraperSession(
             engine=args.engine,
             headless=not args.visible,
             timeout=args.timeout,
-            output_file=args.output,
             user_agents_file=args.user_agents,
-            simulate_human=not args.no_human
-        )
+            simulate_human=not args.no_human,
+            resource_policy=DEFAULT_RESOURCE_POLICY if args.block_resources else None,
+            human_sleep_scale=args.human_sleep_scale,
+        ) as session:
+            html = session.fetch(args.url, output_file=args.output)
+            print(session.stats())
         
         if not args.output:
             print(f"HTML length: {len(html)} characters")
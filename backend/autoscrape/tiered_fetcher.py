@@ -0,0 +1,192 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .html_cache import HtmlCache
+from .playwrightPy import DEFAULT_USER_AGENT_PATH, _load_user_agents
+
+# Substrings a page must contain to count as the real page (and not a challenge/consent page).
+# Plain substring checks are enough here and cost nothing compared to parsing.
+PRODUCT_PAGE_MARKERS = ("info-list-container",)
+OVERVIEW_PAGE_MARKERS = ("/Products/Singles/",)
+
+HTTP_TIMEOUT = 15  # seconds
+HTTP_RETRIES = 2
+HTTP_POOL_SIZE = 8
+
+HTTP_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+class TieredFetcher:
+    """
+    Fetches pages with a plain pooled HTTP client first and only falls back to the browser when needed.
+
+    A page counts as fetched by the HTTP tier when the response is 200 and contains all `markers`.
+    Anything else (challenge page, consent wall, missing content, network error) escalates to the
+    browser tier, i.e. the given ScraperSession (async fetch) or SyncScraperSession (fetch_sync).
+    Hits per tier are counted so the saved browser time shows up in stats().
+
+    With an HtmlCache, valid pages are served from and written to disk. In `replay` mode nothing is
+    fetched at all: pages come only from the cache (expired entries included), misses return "".
+
+    Args:
+        browser: ScraperSession or SyncScraperSession used as fallback
+        markers: Substrings the HTML must contain, e.g. PRODUCT_PAGE_MARKERS
+        use_http: Disable to always use the browser (e.g. while Cardmarket blocks plain clients)
+        cache: Optional HtmlCache in front of both tiers
+        replay: Serve only from the cache (offline runs, parser benchmarks)
+    """
+
+    def __init__(
+        self,
+        browser,
+        markers: Sequence[str] = PRODUCT_PAGE_MARKERS,
+        use_http: bool = True,
+        timeout: float = HTTP_TIMEOUT,
+        retries: int = HTTP_RETRIES,
+        pool_size: int = HTTP_POOL_SIZE,
+        user_agents_file: str = DEFAULT_USER_AGENT_PATH,
+        cache: Optional[HtmlCache] = None,
+        replay: bool = False,
+    ):
+        if replay and cache is None:
+            raise ValueError("replay mode needs a cache")
+        self.browser = browser
+        self.cache = cache
+        self.replay = replay
+        self.markers = tuple(markers)
+        self.use_http = use_http
+        self.timeout = timeout
+        self.retries = retries
+        self.pool_size = pool_size
+        self.user_agent = random.choice(_load_user_agents(user_agents_file))
+        # requests.Session is not guaranteed to be thread-safe: one per worker thread,
+        # each keeping its own keep-alive connections
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = {"cache": 0, "http": 0, "browser": 0, "failed": 0}
+        self.seconds = {"http": 0.0, "browser": 0.0}
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            retry = Retry(total=self.retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=("GET",), respect_retry_after_header=True)
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # requests handles gzip/deflate itself (and br if brotli is installed)
+            session.headers.update(HTTP_HEADERS)
+            session.headers["User-Agent"] = self.user_agent
+            self._local.session = session
+        return session
+
+    def is_valid(self, html: str) -> bool:
+        return bool(html) and all(marker in html for marker in self.markers)
+
+    def _record(self, tier: str, seconds: float, ok: bool) -> None:
+        with self._stats_lock:
+            self.seconds[tier] += seconds
+            if ok:
+                self.hits[tier] += 1
+            elif tier == "browser":
+                self.hits["failed"] += 1
+
+    def cached(self, url: str) -> Optional[str]:
+        """Cache tier only: the cached HTML, or None if the page has to be fetched ("" in replay mode)."""
+        if self.cache is None:
+            return None
+        html = self.cache.get(url, allow_stale=self.replay)
+        if html is not None:
+            with self._stats_lock:
+                self.hits["cache"] += 1
+        elif self.replay:
+            # Nothing to fetch in replay mode, so misses must not wait for a fetch slot either
+            return self._replay_miss()
+        return html
+
+    def _store(self, url: str, html: str) -> None:
+        if self.cache is not None and self.is_valid(html):
+            self.cache.put(url, html)
+
+    def _replay_miss(self) -> str:
+        with self._stats_lock:
+            self.hits["failed"] += 1
+        return ""
+
+    def fetch_http(self, url: str) -> Optional[str]:
+        """HTTP tier only: the HTML if it passed validation, otherwise None."""
+        start = time.perf_counter()
+        html = None
+        try:
+            response = self._session().get(url, timeout=self.timeout)
+            if response.status_code == 200 and self.is_valid(response.text):
+                html = response.text
+        except requests.RequestException:
+            pass
+        self._record("http", time.perf_counter() - start, html is not None)
+        return html
+
+    async def fetch(self, url: str) -> str:
+        """Fetch with an async ScraperSession as browser tier. Returns "" if all tiers failed."""
+        html = self.cached(url)
+        return html if html is not None else await self.fetch_live(url)
+
+    async def fetch_live(self, url: str) -> str:
+        """fetch() without the cache lookup, for callers that already checked cached()."""
+        if self.replay:
+            return self._replay_miss()
+        if self.use_http:
+            html = await asyncio.to_thread(self.fetch_http, url)
+            if html is not None:
+                self._store(url, html)
+                return html
+        start = time.perf_counter()
+        html = await self.browser.fetch(url)
+        self._record("browser", time.perf_counter() - start, bool(html))
+        self._store(url, html)
+        return html
+
+    def fetch_sync(self, url: str) -> str:
+        """Blocking variant of fetch() with a SyncScraperSession as browser tier."""
+        html = self.cached(url)
+        if html is not None:
+            return html
+        if self.use_http:
+            html = self.fetch_http(url)
+            if html is not None:
+                self._store(url, html)
+                return html
+        start = time.perf_counter()
+        html = self.browser.fetch(url)
+        self._record("browser", time.perf_counter() - start, bool(html))
+        self._store(url, html)
+        return html
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            total = sum(self.hits.values())
+            return {
+                **self.hits,
+                "cache_hit_rate": round(self.hits["cache"] / total, 3) if total else 0.0,
+                "http_hit_rate": round(self.hits["http"] / total, 3) if total else 0.0,
+                "http_seconds": round(self.seconds["http"], 2),
+                "browser_seconds": round(self.seconds["browser"], 2),
+            }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (f"cache {stats['cache']}, http {stats['http']}, browser {stats['browser']}, "
+                f"failed {stats['failed']} (cache hit rate {stats['cache_hit_rate']:.0%}, "
+                f"http hit rate {stats['http_hit_rate']:.0%}, {stats['http_seconds']:.1f} s http, "
+                f"{stats['browser_seconds']:.1f} s browser)")
@@ -0,0 +1,73 @@
+"""
+Laufzeitvergleich der Parser-Engines von CardmarketPricePlugin, kein pytest-Test.
+
+    python tests/bench_cardmarket_parser.py [seite.html ...]      (aus backend/)
+
+Misst jede Engine auf den Test-Seiten (bzw. den angegebenen Dateien) plus Produktseiten aus dem
+HTML-Cache, prüft dabei wie test_engines_give_identical_output, dass alle Engines dieselben Felder
+liefern wie html.parser, und vergleicht parse_values() seriell mit parse_many().
+"""
+import gzip
+import os
+import pathlib
+import sys
+import time
+
+import conftest  # noqa: F401  setzt sys.path wie unter pytest
+from autoscrape.cardmarket_parser import PARSER_ENGINES, CardmarketPricePlugin, lxml_html
+from autoscrape.html_cache import HTML_CACHE_PATH
+from test_cardmarket_parser import PAGES
+
+
+def load_pages(paths):
+    if paths:
+        pages = {path: pathlib.Path(path).read_text(encoding="utf-8") for path in paths}
+    else:
+        pages = {name: html for name, html in PAGES.items() if html}
+    for cached in sorted(HTML_CACHE_PATH.glob("*/*.html.gz"))[:200]:
+        with gzip.open(cached, "rt", encoding="utf-8") as f:
+            html_content = f.read()
+        if "info-list-container" in html_content:
+            pages[str(cached)] = html_content
+    return pages
+
+
+def benchmark(pages, repeat=20):
+    plugin = CardmarketPricePlugin()
+    reference = {path: plugin.parse(html_content, "html.parser") for path, html_content in pages.items()}
+    ok = True
+    timings = {}
+    for engine in reversed(PARSER_ENGINES):  # html.parser zuerst als Basis
+        if engine == "lxml" and lxml_html is None:
+            print("lxml nicht installiert, übersprungen")
+            continue
+        mismatches = [path for path, html_content in pages.items()
+                      if plugin.parse(html_content, engine) != reference[path]]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for html_content in pages.values():
+                plugin.parse(html_content, engine)
+        timings[engine] = (time.perf_counter() - start) / (repeat * len(pages))
+        ok = ok and not mismatches
+        print(f"{engine:12} {timings[engine] * 1000:7.2f} ms/Seite  "
+              f"x{timings['html.parser'] / timings[engine]:4.1f}  "
+              f"{'identisch' if not mismatches else f'ANDERS auf {len(mismatches)} Seiten: {mismatches[:3]}'}")
+
+    # Rückstau aus denselben Seiten: parse_values() seriell gegen parse_many() auf allen Kernen
+    backlog = list(pages.values()) * max(1, 400 // len(pages))
+    start = time.perf_counter()
+    serial = [plugin.parse_values(html_content) for html_content in backlog]
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    pooled = list(plugin.parse_many(backlog))
+    pooled_time = time.perf_counter() - start
+    same = pooled == serial
+    ok = ok and same
+    print(f"parse_many   {len(backlog)} Seiten: {serial_time:.2f} s seriell, {pooled_time:.2f} s mit "
+          f"{os.cpu_count()} Workern (x{serial_time / pooled_time:.1f}), "
+          f"{'gleiche Reihenfolge und Werte' if same else 'ANDERS'}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark(load_pages(sys.argv[1:])) else 1)
@@ -0,0 +1,43 @@
+import pathlib
+import sys
+
+import pytest
+
+BACKEND = pathlib.Path(__file__).resolve().parents[1]
+REPO = BACKEND.parent
+# Die API-Module importieren sich flach (wie beim Start aus backend/api), autoscrape als Paket aus backend/
+sys.path[:0] = [str(BACKEND), str(BACKEND / "api")]
+
+
+@pytest.fixture(scope="session")
+def snapshot_path(tmp_path_factory):
+    # Eigener Katalog-Snapshot, cache/catalog.snapshot im Arbeitsbaum bleibt unberührt
+    return str(tmp_path_factory.mktemp("catalog") / "catalog.snapshot")
+
+
+@pytest.fixture(scope="session")
+def catalog(snapshot_path):
+    from catalog import CardCatalog
+    return CardCatalog.load(snapshot_path)
+
+
+@pytest.fixture(scope="session")
+def search_index(catalog):
+    from search_index import SearchIndex
+    return SearchIndex(catalog.cards)
+
+
+@pytest.fixture(scope="session")
+def live_catalog(snapshot_path):
+    from catalog import LiveCatalog
+    return LiveCatalog(snapshot_path)
+
+
+@pytest.fixture
+def api(tmp_path, live_catalog):
+    """Flask-App mit leerem SQLite-Albumspeicher im Temp-Verzeichnis; gibt (Testclient, Speicher) zurück."""
+    from album_store import SqliteAlbumStore
+    from app import create_app
+
+    store = SqliteAlbumStore(str(tmp_path / "albums.sqlite3"))
+    return create_app(live_catalog, store).test_client(), store
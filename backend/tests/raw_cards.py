@@ -0,0 +1,37 @@
+"""Der frühere Katalog-Aufbau (Roh-Dicts pro Karte), nur noch als Vergleichsbasis für test_catalog_memory."""
+import json
+import os
+
+from helper import CACHE_PATH, load_set_mapping
+
+
+def load_raw_cards():
+    cards = []
+    set_mapping = load_set_mapping()
+
+    for filename in os.listdir(CACHE_PATH):
+        if filename.endswith(".json"):
+            set_name = set_mapping.get(filename.split('.')[0], None)
+            with open(os.path.join(CACHE_PATH, filename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                for card in data:
+                    card["set"] = set_name
+                    cards.append(card)
+    return cards
+
+
+def normalize_raw_card(raw):
+    low = raw.get("cardmarket", {}).get("prices", {}).get("lowPrice", 0) or 0
+    reverse = raw.get("cardmarket", {}).get("prices", {}).get("reverseHolo", 0) or None
+    return {
+        "id": raw.get("id"),
+        "name": raw.get("name"),
+        "set": raw.get("set") or raw.get("setName"),
+        "number": raw.get("number"),
+        "rarity": raw.get("rarity"),
+        "image": raw.get("images", {}).get("small") if raw.get("images") else None,
+        "priceLow": low,
+        "priceReverse": reverse,
+        "updatedAt": raw.get("cardmarket", {}).get("updatedAt"),
+    }
@@ -0,0 +1,99 @@
+import json
+import os
+
+from album_store import JournalAlbumStore, JsonAlbumStore, SqliteAlbumStore, migrate_json_albums
+
+
+def counts(album):
+    return {card["card_id"]: (card["count_normal"], card["count_reverse"]) for card in album["cards"]}
+
+
+def test_sqlite_batch_returns_only_touched_rows(tmp_path):
+    store = SqliteAlbumStore(str(tmp_path / "albums.sqlite3"))
+    store.add_cards("a", [(f"base1-{n}", 1, 0) for n in range(1, 101)])
+    statements = []
+    store._conn().set_trace_callback(statements.append)
+
+    # Mehr IDs als in ein IN (...) passen, damit auch das Stückeln abgedeckt ist
+    batch = [("base1-5", 2, 1)] + [(f"jungle-{n}", 1, 0) for n in range(1, 1201)]
+    entries, before, after = store.add_cards_versioned("a", batch)
+
+    assert set(entries) == {card_id for card_id, _, _ in batch}
+    assert entries["base1-5"] == {"card_id": "base1-5", "set": "base1", "count_normal": 3, "count_reverse": 1}
+    assert after == before + 1
+    # Kein Zurücklesen des ganzen Albums
+    reads = [sql for sql in statements if sql.startswith("SELECT") and "album_cards" in sql]
+    assert reads and all("card_id IN" in sql for sql in reads)
+
+
+def test_migrate_json_albums_to_sqlite(tmp_path):
+    source = JsonAlbumStore(str(tmp_path / "json"))
+    source.save("domi", {"album_name": "domi", "owner": "Domi", "cards": [
+        {"card_id": "base1-4", "set": "base1", "count_normal": 2, "count_reverse": 0},
+        {"card_id": "swsh1-10", "set": "swsh1", "count_normal": 0, "count_reverse": 1},
+    ]})
+    source.save("leer", {"album_name": "leer", "cards": []})
+    target = SqliteAlbumStore(str(tmp_path / "albums.sqlite3"))
+
+    assert migrate_json_albums(target, source) == ["domi", "leer"]
+    assert target.load("domi") == source.load("domi")
+    assert target.load("leer") == {"album_name": "leer", "cards": []}
+
+    # Bestehende Alben bleiben ohne overwrite unangetastet
+    target.add_card("domi", "base1-4")
+    assert migrate_json_albums(target, source) == []
+    assert counts(target.load("domi"))["base1-4"] == (3, 0)
+    assert migrate_json_albums(target, source, overwrite=True) == ["domi", "leer"]
+    assert counts(target.load("domi"))["base1-4"] == (2, 0)
+
+
+def crashed_store(path):
+    # Ein Prozess, der ohne close() endet: Journal geschrieben, aber nie in den Snapshot gefaltet
+    store = JournalAlbumStore(path, fsync="never", compact_threshold=10**6)
+    store.add_card("a", "base1-1")
+    store.add_cards("a", [("base1-1", 0, 1), ("base1-2", 1, 0)])
+    store.sync(compact_all=True)
+    store.add_cards("a", [("base1-2", 2, 0), ("base1-3", 1, 0)])
+    store._albums["a"].journal.close()
+    return store
+
+
+def test_journal_recovery_replays_entries_after_the_snapshot(tmp_path):
+    path = str(tmp_path)
+    crashed_store(path)
+
+    recovered = JournalAlbumStore(path, fsync="never")
+    assert counts(recovered.load("a")) == {"base1-1": (1, 1), "base1-2": (3, 0), "base1-3": (1, 0)}
+    assert recovered.version("a") == 3
+
+
+def test_journal_recovery_skips_lines_already_in_the_snapshot(tmp_path):
+    # Absturz zwischen Snapshot schreiben und Journal leeren: alte Zeilen dürfen nicht doppelt zählen
+    path = str(tmp_path)
+    store = crashed_store(path)
+    journal = os.path.join(path, "a.journal")
+    with open(journal, "rb") as f:
+        lines = f.read()
+    store.sync(compact_all=True)
+    with open(journal, "wb") as f:
+        f.write(lines)
+
+    recovered = JournalAlbumStore(path, fsync="never")
+    assert counts(recovered.load("a")) == {"base1-1": (1, 1), "base1-2": (3, 0), "base1-3": (1, 0)}
+
+
+def test_journal_recovery_cuts_off_a_torn_last_line(tmp_path):
+    path = str(tmp_path)
+    crashed_store(path)
+    journal = os.path.join(path, "a.journal")
+    with open(journal, "ab") as f:
+        f.write(json.dumps({"seq": 4, "items": [["base1-9", 1, 0]]}).encode()[:20])
+
+    recovered = JournalAlbumStore(path, fsync="never")
+    assert counts(recovered.load("a")) == {"base1-1": (1, 1), "base1-2": (3, 0), "base1-3": (1, 0)}
+    with open(journal, "rb") as f:
+        assert f.read().endswith(b"\n")
+
+    # Neue Zeilen hängen nicht an der abgeschnittenen und überstehen den nächsten Neustart
+    recovered.add_card("a", "base1-9")
+    assert counts(JournalAlbumStore(path, fsync="never").load("a"))["base1-9"] == (1, 0)
@@ -0,0 +1,71 @@
+"""Album-Schreibzugriffe aus mehreren Prozessen (wie mehrere gunicorn-Worker) dürfen keine Erhöhung verlieren."""
+import multiprocessing
+import os
+import random
+
+import pytest
+
+from album_store import JournalAlbumStore, JsonAlbumStore, SqliteAlbumStore
+
+ALBUM = "stress"
+CARD_IDS = [f"base1-{n}" for n in range(1, 11)]
+PROCESSES = 8
+ADDS = 500
+
+
+def open_store(backend, path):
+    if backend == "json":
+        return JsonAlbumStore(path)
+    if backend == "sqlite":
+        return SqliteAlbumStore(os.path.join(path, "albums.sqlite3"))
+    # Kleine Schwelle, damit während des Tests auch kompaktiert wird
+    return JournalAlbumStore(path, fsync="never", compact_threshold=100)
+
+
+def worker(backend, path, adds, seed, queue):
+    # Jeder Prozess erhöht dieselben Karten im selben Album, teils einzeln, teils als Stapel
+    store = open_store(backend, path)
+    rng = random.Random(seed)
+    expected = {card_id: [0, 0] for card_id in CARD_IDS}
+    done = 0
+    while done < adds:
+        if rng.random() < 0.2:
+            batch = [(rng.choice(CARD_IDS), 1, rng.randint(0, 1)) for _ in range(min(10, adds - done))]
+            store.add_cards(ALBUM, batch)
+        else:
+            batch = [(rng.choice(CARD_IDS), 1, rng.randint(0, 1))]
+            store.add_card(ALBUM, *batch[0])
+        for card_id, normal, reverse in batch:
+            expected[card_id][0] += normal
+            expected[card_id][1] += reverse
+        done += len(batch)
+        if backend == "journal" and rng.random() < 0.01:
+            store.sync(compact_all=True)
+    if backend == "journal":
+        store.close()
+    queue.put(expected)
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite", "journal"])
+def test_concurrent_adds_from_processes(backend, tmp_path):
+    path = str(tmp_path)
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=worker, args=(backend, path, ADDS, seed, queue))
+               for seed in range(PROCESSES)]
+    for process in workers:
+        process.start()
+    results = [queue.get(timeout=60) for _ in workers]
+    for process in workers:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    expected = {card_id: [0, 0] for card_id in CARD_IDS}
+    for result in results:
+        for card_id, (normal, reverse) in result.items():
+            expected[card_id][0] += normal
+            expected[card_id][1] += reverse
+    album = open_store(backend, path).load(ALBUM)
+    actual = {card["card_id"]: [card["count_normal"], card["count_reverse"]] for card in album["cards"]}
+
+    assert {card_id: actual.get(card_id, [0, 0]) for card_id in CARD_IDS} == expected
+    assert sum(normal for normal, _ in actual.values()) == PROCESSES * ADDS
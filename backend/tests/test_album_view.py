@@ -0,0 +1,62 @@
+import pytest
+
+from album_view import MAX_PAGE_LIMIT, decode_cursor, encode_cursor, sort_key
+
+
+def test_cursor_roundtrip():
+    key = sort_key({"id": "sv3pt5-25", "number": "25"})
+    assert decode_cursor(encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize("key", [
+    [1, 2, 3, 4, 5],
+    ["sv3pt5", "", "25", "", "sv3pt5-25"],
+    ["sv3pt5", "", True, "", "sv3pt5-25"],
+    ["sv3pt5", None, 25, "", "sv3pt5-25"],
+    ["sv3pt5", "", 25, ""],
+    {"set": "sv3pt5"},
+])
+def test_decode_cursor_rejects_keys_of_the_wrong_shape(key):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(key))
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("!!kein-base64!!")
+
+
+def test_cards_route_answers_400_for_mistyped_cursor(api):
+    client, store = api
+    store.add_cards_versioned("test", [("sv3pt5-25", 1, 0), ("sv3pt5-1", 1, 0)])
+
+    first = client.get("/album/test/cards?limit=1").get_json()
+    assert len(first["cards"]) == 1 and first["next_cursor"]
+    second = client.get(f"/album/test/cards?limit=1&cursor={first['next_cursor']}").get_json()
+    assert [card["id"] for card in first["cards"] + second["cards"]] == ["sv3pt5-1", "sv3pt5-25"]
+
+    # [1,2,3,4,5]: richtige Länge, aber nicht mit dem Sortierschlüssel vergleichbar
+    response = client.get("/album/test/cards?limit=1&cursor=WzEsMiwzLDQsNV0")
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("query", ["limit=abc", "limit=0", "limit=-5", "limit=1001", "limit=", "cursor=!!kaputt!!"])
+def test_cards_route_answers_400_for_bad_paging_params(api, query):
+    client, store = api
+    store.add_cards_versioned("test", [("sv3pt5-25", 1, 0)])
+
+    response = client.get(f"/album/test/cards?{query}")
+    assert response.status_code == 400
+    assert "cards" not in response.get_json()
+    # Auch für ein Album, das es (noch) nicht gibt
+    assert client.get(f"/album/fehlt/cards?{query}").status_code == 400
+
+
+def test_cards_route_treats_empty_cursor_as_first_page(api):
+    client, store = api
+    store.add_cards_versioned("test", [("sv3pt5-25", 1, 0), ("sv3pt5-1", 1, 0)])
+
+    page = client.get("/album/test/cards?cursor=").get_json()
+    assert [card["id"] for card in page["cards"]] == ["sv3pt5-1", "sv3pt5-25"]
+    assert page["next_cursor"] is None
+    assert client.get(f"/album/test/cards?limit={MAX_PAGE_LIMIT}").status_code == 200
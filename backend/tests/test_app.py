@@ -0,0 +1,55 @@
+def test_get_album_uses_etag(api):
+    client, store = api
+    store.add_cards_versioned("test", [("sv3pt5-25", 1, 0)])
+
+    response = client.get("/album/test")
+    assert response.status_code == 200 and response.headers.get("ETag")
+    assert client.get("/album/test", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_get_album_without_version_is_404(api, monkeypatch):
+    client, store = api
+    store.add_cards_versioned("test", [("sv3pt5-25", 1, 0)])
+    # z.B. Album zwischen version() und load() angelegt: kein ETag möglich, aber kein 500
+    monkeypatch.setattr(store, "version", lambda album_name: None)
+
+    assert client.get("/album/test").status_code == 404
+    assert client.get("/album/missing").status_code == 404
+
+
+def test_batch_adds_valid_items_and_reports_invalid_ones(api):
+    client, store = api
+    response = client.post("/album/test/add_cards/batch", json={"cards": [
+        {"card_id": "sv3pt5-25", "count_normal": 2},
+        {"card_id": "sv3pt5-1", "count_normal": 0, "count_reverse": 1},
+        {"card_id": "sv3pt5-2", "count_normal": -1},
+        {"card_id": "sv3pt5-3", "count_normal": True},
+        {"card_id": "sv3pt5-4", "count_normal": 0, "count_reverse": 0},
+        {"card_id": "sv3pt5-5", "count_normal": 1.5},
+        {"count_normal": 1},
+    ]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["added"] == 2
+    assert [result["status"] for result in body["results"]] == ["ok", "ok"] + ["error"] * 5
+    counts = {card["card_id"]: (card["count_normal"], card["count_reverse"]) for card in store.load("test")["cards"]}
+    assert counts == {"sv3pt5-25": (2, 0), "sv3pt5-1": (0, 1)}
+
+
+def test_batch_without_valid_items_is_400(api):
+    client, store = api
+    response = client.post("/album/test/add_cards/batch", json=[
+        {"card_id": "sv3pt5-2", "count_normal": -1},
+        {"card_id": "sv3pt5-3", "count_normal": False, "count_reverse": 0},
+    ])
+
+    assert response.status_code == 400
+    assert response.get_json()["added"] == 0
+    assert store.version("test") is None
+
+
+def test_batch_without_cards_is_400(api):
+    client, _ = api
+    assert client.post("/album/test/add_cards/batch", json={"cards": []}).status_code == 400
+    assert client.post("/album/test/add_cards/batch", json={"foo": 1}).status_code == 400
@@ -0,0 +1,60 @@
+import pathlib
+
+import pytest
+
+from autoscrape import cardmarket_parser
+from autoscrape.cardmarket_parser import PARSER_ENGINES, CardmarketPricePlugin, extract_field
+from conftest import REPO
+
+PRODUCT_PAGE = (pathlib.Path(__file__).parent / "fixtures" / "product_page.html").read_text(encoding="utf-8")
+
+EXPECTED = {
+    "card_name": "Charizard ex",
+    "card_set": "151",
+    "card_rarity": "Double Rare",
+    "card_number": "006",
+    "available_items": 1284,
+    "lowest_price": 2.95,
+    "price_trend": 3.31,
+    "avg_30_days": 1003.45,
+    "avg_7_days": 3.4,
+    "avg_1_day": 3.12,
+    "card_expansion": "151",
+}
+
+PAGES = {
+    "product": PRODUCT_PAGE,
+    # Keine Produktseite, keine Felder
+    "website_1": (REPO / "website_1.html").read_text(encoding="utf-8"),
+    "empty": "",
+}
+
+
+@pytest.fixture(params=PARSER_ENGINES)
+def engine(request):
+    if request.param == "lxml" and cardmarket_parser.lxml_html is None:
+        pytest.skip("lxml nicht installiert")
+    return request.param
+
+
+def test_product_page_values(engine):
+    assert CardmarketPricePlugin().parse_values(PRODUCT_PAGE, engine) == EXPECTED
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_engines_give_identical_output(engine, page):
+    plugin = CardmarketPricePlugin()
+    html = PAGES[page]
+    assert plugin.parse_values(html, engine) == plugin.parse_values(html, "html.parser")
+    assert plugin.parse(html, engine) == plugin.parse(html, "html.parser")
+
+
+def test_extract_field():
+    assert extract_field(PRODUCT_PAGE) == 3.4
+    assert extract_field(PRODUCT_PAGE, "price_trend") == 3.31
+    assert extract_field(PAGES["website_1"]) is None
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        CardmarketPricePlugin().parse_values(PRODUCT_PAGE, "regex")
@@ -0,0 +1,53 @@
+"""Speicher pro Worker: der Katalog als CardRecord gegen die früheren normalisierten Roh-Dicts (raw_cards)."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND
+
+MEASURE = """
+import gc
+
+
+def rss_mb():
+    with open("/proc/self/status", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+
+before = rss_mb()
+{load}
+gc.collect()
+print(len(data), rss_mb() - before)
+"""
+
+LOADERS = {
+    "raw": "from raw_cards import load_raw_cards, normalize_raw_card\n"
+           "cards = load_raw_cards()\n"
+           "data = [normalize_raw_card(c) for c in cards]",
+    "records": "from helper import load_card_records\n"
+               "data = load_card_records()",
+}
+
+
+def measure(label):
+    # Eigener Prozess je Variante, damit der RSS nicht vom anderen Aufbau oder von pytest abhängt
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(BACKEND / "tests"), os.environ.get("PYTHONPATH", "")])}
+    out = subprocess.check_output([sys.executable, "-c", MEASURE.format(load=LOADERS[label])],
+                                  cwd=BACKEND / "api", env=env).decode()
+    cards, mb = out.split()
+    return int(cards), float(mb)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="RSS aus /proc nur unter Linux")
+def test_card_records_use_less_memory_than_raw_dicts():
+    raw_cards, raw_mb = measure("raw")
+    record_cards, record_mb = measure("records")
+    print(f"Roh-Dicts {raw_cards} Karten, {raw_mb:.1f} MB; CardRecord {record_cards} Karten, "
+          f"{record_mb:.1f} MB")
+
+    assert record_cards == raw_cards
+    assert record_mb < raw_mb * 0.75
@@ -0,0 +1,172 @@
+import asyncio
+import csv
+import io
+import re
+import threading
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import update_cache
+from autoscrape.cardmarket_parser import extract_field
+from autoscrape.fetch_pipeline import TokenBucket, fetch_and_parse
+from conftest import REPO
+from test_cardmarket_parser import PRODUCT_PAGE
+
+PAGES = 40
+# /page/<name>: echte Seiten, die Produktseite mit Preisen und website_1.html (keine Produktseite)
+FIXTURE_PAGES = {
+    "product": PRODUCT_PAGE.encode(),
+    "website_1": (REPO / "website_1.html").read_bytes(),
+}
+
+
+def page_number(html):
+    # Läuft im Worker-Prozess, muss also auf Modulebene liegen
+    return int(re.search(r'<p id="n">(\d+)</p>', html).group(1))
+
+
+@pytest.fixture(scope="module")
+def server():
+    """
+    Lokaler HTTP-Ersatz: /product/<i> liefert eine Seite mit i, spätere Seiten schneller (Abschluss
+    außer Reihe); /page/<name> liefert eine Seite aus FIXTURE_PAGES.
+    """
+    hits = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.setdefault(self.headers["Host"].split(":")[0], []).append(time.monotonic())
+            kind, name = self.path.split("?")[0].strip("/").split("/")
+            if kind == "page":
+                body = FIXTURE_PAGES[name]
+            else:
+                number = int(name)
+                time.sleep(0.005 * (number % 7))
+                body = f'<html><body><p id="n">{number}</p></body></html>'.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    # Zwei Hostnamen für denselben Server, jeder bekommt einen eigenen Token-Bucket
+    urls = [f"http://{'127.0.0.1' if i % 2 else 'localhost'}:{port}/product/{i}" for i in range(PAGES)]
+    yield urls, hits, f"http://127.0.0.1:{port}"
+    httpd.shutdown()
+
+
+async def fetch(url):
+    def get():
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.read().decode("utf-8")
+    return await asyncio.to_thread(get)
+
+
+def run_pipeline(urls, **options):
+    async def run():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            return [result async for result in fetch_and_parse(urls, fetch, page_number, executor=executor,
+                                                               **options)]
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("concurrency", [1, 8])
+def test_results_in_input_order_with_values(server, concurrency):
+    urls, _, _ = server
+    results = run_pipeline(urls, concurrency=concurrency, rate=1000.0, burst=1)
+
+    assert [result.index for result in results] == list(range(PAGES))
+    assert [result.url for result in results] == urls
+    assert [(result.error, result.value) for result in results] == [(None, i) for i in range(PAGES)]
+
+
+def test_rate_limit_per_host(server):
+    urls, hits, _ = server
+    rate, burst = 20.0, 2
+    hits.clear()
+    results = run_pipeline(urls[:20], concurrency=8, rate=rate, burst=burst)
+
+    assert all(result.error is None for result in results)
+    assert set(hits) == {"localhost", "127.0.0.1"}
+    for times in hits.values():
+        # Nie mehr als burst + rate * Dauer Anfragen (eine Anfrage Spiel für Jitter bis zum Server)
+        assert len(times) <= burst + rate * (max(times) - min(times)) + 1
+
+
+def test_errors_are_returned_per_url():
+    async def flaky(url):
+        if url.endswith("1"):
+            raise ConnectionError(url)
+        return f'<p id="n">{url[-1]}</p>'
+
+    async def run():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            return [result async for result in fetch_and_parse(["u0", "u1", "u2"], flaky, page_number,
+                                                               rate=1000.0, executor=executor)]
+
+    results = asyncio.run(run())
+    assert [result.value for result in results] == [0, None, 2]
+    assert isinstance(results[1].error, ConnectionError)
+
+
+def test_token_bucket_rate():
+    async def run():
+        bucket = TokenBucket(rate=50.0, burst=3)
+        start = time.monotonic()
+        for _ in range(13):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # 3 Token sofort, die übrigen 10 mit 50/s
+    elapsed = asyncio.run(run())
+    assert 10 / 50 * 0.9 <= elapsed < 10 / 50 + 0.5
+
+
+class NoBrowser:
+    """Browser-Stufe für refresh_prices ohne Chromium: jede Seite, die HTTP nicht liefert, bleibt leer."""
+
+    def __init__(self, **options):
+        self.urls = []
+
+    async def fetch(self, url, **options):
+        self.urls.append(url)
+        return ""
+
+    async def close(self):
+        pass
+
+    def stats(self):
+        return {"pages": 0}
+
+
+def test_refresh_prices_against_fixture_pages(server, monkeypatch):
+    _, _, base = server
+    monkeypatch.setattr(update_cache, "ScraperSession", NoBrowser)
+    product, website = f"{base}/page/product", f"{base}/page/website_1"
+    rows = [{"set": "sv3pt5", "nr": str(nr)} for nr in range(1, 6)]
+    urls = [product, website, None, product, website]
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["set", "nr", "online_price"])
+    unmatched = []
+
+    asyncio.run(update_cache.refresh_prices(rows, urls, writer, unmatched, concurrency=4, rate=1000.0,
+                                            human_sleep_scale=0))
+
+    # 7-Tage-Durchschnitt der Produktseite, auch für die doppelte URL; website_1.html hat keinen Preis
+    assert extract_field(FIXTURE_PAGES["product"].decode()) == 3.4
+    assert [row["online_price"] for row in rows] == [3.4, "", "", 3.4, ""]
+    assert out.getvalue().splitlines()[0] == "sv3pt5,1,3.4"
+    assert [(entry["nr"], entry["reason"], entry["detail"]) for entry in unmatched] == [
+        ("2", "fetch_failed", update_cache.NO_PRICE),
+        ("5", "fetch_failed", update_cache.NO_PRICE),
+    ]
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from autoscrape import overview_parser
+from autoscrape.overview_parser import iter_overview_pages, iter_overview_rows
+from conftest import REPO
+
+BASE = "https://www.cardmarket.com/en/Pokemon/Products/Singles/151/"
+
+# debug_seite_1.html (151, Seite 1): Nummer, Name, URL-Ende, Preis, Preis Reverse, Promo
+EXPECTED = [
+    ("1", "Bulbasaur (MEW 001)", "Bulbasaur-V3-MEW001", 24.99, None, True),
+    ("1", "Bulbasaur (MEW 001)", "Bulbasaur-V1-MEW001", 0.02, 0.02, False),
+    ("1", "Bulbasaur (MEW 001)", "Bulbasaur-V4-MEW001", 3.72, 3.72, True),
+    ("2", "Ivysaur (MEW 002)", "Ivysaur-V1-MEW002", 0.02, 0.02, False),
+    ("3", "Venusaur ex (MEW 003)", "Venusaur-ex-V1-MEW003", 0.3, None, False),
+    ("4", "Charmander (MEW 004)", "Charmander-V3-MEW004", 68.5, None, True),
+    ("4", "Charmander (MEW 004)", "Charmander-V1-MEW004", 0.02, 0.02, False),
+    ("4", "Charmander (MEW 004)", "Charmander-V4-MEW004", 210.0, 210.0, True),
+    ("4", "Charmander (MEW 004)", "Charmander-V5-MEW004", 0.85, None, True),
+    ("4", "Charmander (MEW 004)", "Charmander-V6-MEW004", 3.95, 3.95, True),
+    ("5", "Charmeleon (MEW 005)", "Charmeleon-V1-MEW005", 0.02, 0.03, False),
+    ("5", "Charmeleon (MEW 005)", "Charmeleon-V5-MEW005", 0.9, None, True),
+    ("6", "Charizard ex (MEW 006)", "Charizard-ex-V1-MEW006", 3.3, None, False),
+]
+
+ENGINES = [overview_parser._iter_rows_soup]
+if overview_parser.lxml_html is not None:
+    ENGINES.append(overview_parser._iter_rows_lxml)
+
+
+@pytest.fixture(scope="module")
+def overview_html():
+    return (REPO / "debug_seite_1.html").read_text(encoding="utf-8")
+
+
+def as_expected(rows):
+    # Der Linktext bricht im HTML um, verglichen wird der Name mit einfachen Leerzeichen
+    return [(row.number, " ".join(row.name.split()), row.url[len(BASE):] if row.url.startswith(BASE) else row.url,
+             row.price, row.price_rev, row.promo) for row in rows]
+
+
+@pytest.mark.parametrize("engine", ENGINES, ids=lambda engine: engine.__name__)
+def test_rows_of_fixture_page(overview_html, engine):
+    assert as_expected(engine(overview_html)) == EXPECTED
+
+
+def test_iter_overview_rows(overview_html):
+    assert as_expected(iter_overview_rows(overview_html)) == EXPECTED
+    assert list(iter_overview_rows("")) == []
+
+
+def test_pages_are_prefetched_while_rows_are_processed(overview_html):
+    pages, latency = 4, 0.05
+    fetched = []
+
+    def fetch(url):
+        time.sleep(latency)
+        page = int(url.rsplit("=", 1)[1])
+        fetched.append(page)
+        return overview_html if page <= pages else ""
+
+    start = time.perf_counter()
+    seen = []
+    for page, rows in iter_overview_pages("https://example.invalid/?x=1", fetch, delay=0):
+        seen.append((page, len(rows)))
+        time.sleep(latency)
+    elapsed = time.perf_counter() - start
+
+    assert seen == [(page, len(EXPECTED)) for page in range(1, pages + 1)] + [(pages + 1, 0)]
+    assert fetched == list(range(1, pages + 2))
+    # Ohne Vorabladen wären es 2 * (pages + 1) * latency
+    assert elapsed < 2 * (pages + 1) * latency * 0.85
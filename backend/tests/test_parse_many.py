@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from autoscrape import templated_plugin
+from autoscrape.cardmarket_parser import CardmarketPricePlugin
+from autoscrape.templated_plugin import PARSE_POOL_MIN_PAGES
+from test_cardmarket_parser import PAGES
+
+
+def backlog(size):
+    pages = list(PAGES.values())
+    # Verschiedene Seiten in wechselnder Reihenfolge, damit eine Vertauschung auffällt
+    return [pages[i % len(pages)] + f"<p>{i}</p>" for i in range(size)]
+
+
+@pytest.mark.parametrize("size,workers", [(0, None), (5, None), (PARSE_POOL_MIN_PAGES - 1, 2),
+                                          (100, 1), (100, 2)])
+def test_parse_many_matches_parse_values(size, workers):
+    plugin = CardmarketPricePlugin()
+    htmls = backlog(size)
+    assert list(plugin.parse_many(iter(htmls), workers=workers, chunksize=7)) == \
+        [plugin.parse_values(html) for html in htmls]
+
+
+def test_parse_many_with_executor():
+    plugin = CardmarketPricePlugin()
+    htmls = backlog(20)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert list(plugin.parse_many(htmls, chunksize=3, executor=executor)) == \
+            [plugin.parse_values(html) for html in htmls]
+
+
+@pytest.mark.parametrize("size,workers", [(PARSE_POOL_MIN_PAGES - 1, 4), (100, 1)])
+def test_small_batches_and_single_worker_skip_the_pool(monkeypatch, size, workers):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("Prozesspool gestartet")
+
+    monkeypatch.setattr(templated_plugin, "ProcessPoolExecutor", no_pool)
+    plugin = CardmarketPricePlugin()
+    assert len(list(plugin.parse_many(backlog(size), workers=workers))) == size
@@ -0,0 +1,205 @@
+import asyncio
+
+import pytest
+
+from autoscrape import playwrightPy
+from autoscrape.playwrightPy import ScraperSession, close_async_sessions, scrape_with_playwright
+
+
+class FakeSession:
+    """Stands in for ScraperSession in the wrapper tests, records fetches and closes."""
+    instances = []
+
+    def __init__(self, **options):
+        self.closed = False
+        self.fetches = 0
+        FakeSession.instances.append(self)
+
+    async def fetch(self, url, **options):
+        assert not self.closed
+        self.fetches += 1
+        return f"<html>{url}</html>"
+
+    async def close(self):
+        self.closed = True
+
+
+def test_wrapper_sessions_are_closed_with_their_loop(monkeypatch):
+    monkeypatch.setattr(playwrightPy, "ScraperSession", FakeSession)
+    FakeSession.instances = []
+
+    async def scrape_twice():
+        await scrape_with_playwright("https://example.invalid/1")
+        return await scrape_with_playwright("https://example.invalid/2")
+
+    for _ in range(3):
+        assert asyncio.run(scrape_twice()) == "<html>https://example.invalid/2</html>"
+
+    # Eine Session pro asyncio.run, jeweils für beide Aufrufe benutzt und beim Beenden geschlossen
+    assert [(s.fetches, s.closed) for s in FakeSession.instances] == [(2, True)] * 3
+    assert not playwrightPy._async_sessions and not playwrightPy._loop_closers
+
+
+def test_close_async_sessions_closes_only_the_current_sessions(monkeypatch):
+    monkeypatch.setattr(playwrightPy, "ScraperSession", FakeSession)
+    FakeSession.instances = []
+
+    async def run():
+        await scrape_with_playwright("https://example.invalid/1")
+        await close_async_sessions()
+        await scrape_with_playwright("https://example.invalid/2")
+        return [s.closed for s in FakeSession.instances]
+
+    assert asyncio.run(run()) == [True, False]
+    assert [s.closed for s in FakeSession.instances] == [True, True]
+
+
+class FakeBrowser:
+    failing_contexts = 0  # so viele new_context()-Aufrufe schlagen fehl
+
+    def __init__(self, log):
+        self.log = log
+        self.open_pages = 0
+        self.pages = 0
+
+    async def new_context(self, **options):
+        if FakeBrowser.failing_contexts:
+            FakeBrowser.failing_contexts -= 1
+            raise RuntimeError("Target closed")
+        return FakeContext(self)
+
+    async def close(self):
+        self.log.append(("browser closed", self.open_pages, self.pages))
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakePage(self.browser)
+
+    async def add_init_script(self, script):
+        pass
+
+    async def route(self, pattern, handler):
+        pass
+
+    def on(self, event, handler):
+        pass
+
+    async def close(self):
+        pass
+
+
+class FakeResponse:
+    status = 200
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        browser.open_pages += 1
+        browser.pages += 1
+
+    async def goto(self, url, **options):
+        # Lange genug, dass sich die parallelen Abrufe überlappen
+        await asyncio.sleep(0.01)
+        return FakeResponse()
+
+    async def wait_for_selector(self, selector, **options):
+        pass
+
+    async def wait_for_load_state(self, state):
+        pass
+
+    async def content(self):
+        return "<html></html>"
+
+    async def close(self):
+        self.browser.open_pages -= 1
+
+
+class FakeChromium:
+    def __init__(self, log):
+        self.log = log
+
+    async def launch(self, **options):
+        await asyncio.sleep(0.01)
+        self.log.append(("browser launched",))
+        return FakeBrowser(self.log)
+
+
+class FakePlaywright:
+    def __init__(self, log):
+        self.log = log
+        self.chromium = FakeChromium(log)
+
+    async def stop(self):
+        self.log.append(("driver stopped",))
+
+
+@pytest.fixture
+def browser_log(monkeypatch):
+    """Ersetzt nur den Playwright-Treiber; start(), Pool und Recycling laufen unverändert."""
+    log = []
+
+    async def start_driver(self):
+        # Der echte Treiberstart dauert, in der Zeit kommen weitere erste Abrufe an
+        await asyncio.sleep(0.01)
+        log.append(("driver started",))
+        return FakePlaywright(log)
+
+    monkeypatch.setattr(ScraperSession, "_start_driver", start_driver)
+    monkeypatch.setattr(FakeBrowser, "failing_contexts", 0)
+    return log
+
+
+def events(log, name):
+    return [entry for entry in log if entry[0] == name]
+
+
+def test_concurrent_first_fetches_start_one_browser(browser_log):
+    async def run():
+        session = ScraperSession(pool_size=4, simulate_human=False)
+        results = await asyncio.gather(*(session.fetch(f"https://example.invalid/{i}") for i in range(4)))
+        await session.close()
+        return session, results
+
+    session, results = asyncio.run(run())
+
+    assert results == ["<html></html>"] * 4
+    assert session.browser_launches == 1
+    assert len(events(browser_log, "driver started")) == 1
+    assert events(browser_log, "browser closed") == [("browser closed", 0, 4)]
+    assert len(events(browser_log, "driver stopped")) == 1
+
+
+def test_failed_context_returns_empty_page_and_frees_the_slot(browser_log):
+    FakeBrowser.failing_contexts = 1
+
+    async def run():
+        session = ScraperSession(pool_size=1, simulate_human=False)
+        first = await session.fetch("https://example.invalid/1")
+        # Ohne zurückgegebenen Slot würde dieser Abruf ewig warten
+        second = await asyncio.wait_for(session.fetch("https://example.invalid/2"), timeout=5)
+        await session.close()
+        return first, second
+
+    assert asyncio.run(run()) == ("", "<html></html>")
+
+
+def test_browser_is_recycled_under_constant_load(browser_log):
+    async def run():
+        session = ScraperSession(pool_size=4, browser_max_pages=10, simulate_human=False)
+        # Immer mehr Abrufe als Slots: es gibt nie einen Moment, in dem alle anderen Slots frei sind
+        results = await asyncio.gather(*(session.fetch(f"https://example.invalid/{i}") for i in range(40)))
+        await session.close()
+        return session, results
+
+    session, results = asyncio.run(run())
+
+    assert results == ["<html></html>"] * 40
+    # Jeder Browser liefert genau browser_max_pages Seiten und wird erst geschlossen, wenn keine mehr offen ist
+    assert session.browser_launches == 4
+    assert events(browser_log, "browser closed") == [("browser closed", 0, 10)] * 4
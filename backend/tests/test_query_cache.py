@@ -0,0 +1,67 @@
+import threading
+import time
+
+from query_cache import QueryCache
+
+
+def test_old_version_does_not_clear_or_read_the_cache():
+    cache = QueryCache()
+    assert cache.get_or_compute("pikachu", 2, lambda: "neu") == "neu"
+
+    # Eine noch laufende Anfrage mit dem alten Katalog: eigenes Ergebnis, Cache bleibt unverändert
+    assert cache.get_or_compute("pikachu", 1, lambda: "alt") == "alt"
+    assert cache.stats()["version"] == 2
+    assert cache.get_or_compute("pikachu", 2, lambda: "falsch") == "neu"
+
+    assert cache.get_or_compute("pikachu", 3, lambda: "neuer") == "neuer"
+    assert cache.stats()["size"] == 1
+
+
+def test_pending_computation_is_not_shared_across_versions():
+    cache = QueryCache()
+    started, release = threading.Event(), threading.Event()
+    results = {}
+
+    def slow_old():
+        started.set()
+        release.wait(5)
+        return "alt"
+
+    worker = threading.Thread(target=lambda: results.update(old=cache.get_or_compute("mew", 1, slow_old)))
+    worker.start()
+    assert started.wait(5)
+    # Katalog neu geladen, während die alte Berechnung noch läuft: nicht an ihr anhängen
+    results["new"] = cache.get_or_compute("mew", 2, lambda: "neu")
+    release.set()
+    worker.join(5)
+
+    assert results == {"old": "alt", "new": "neu"}
+    assert cache.get_or_compute("mew", 2, lambda: "falsch") == "neu"
+
+
+def test_identical_requests_share_one_computation():
+    cache = QueryCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "wert"
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_compute("mew", 1, slow)))
+    owner.start()
+    assert started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_compute("mew", 1, slow)))
+    waiter.start()
+    for _ in range(500):
+        if cache.stats()["coalesced"]:
+            break
+        time.sleep(0.01)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert results == ["wert", "wert"] and len(calls) == 1
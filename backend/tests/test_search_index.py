@@ -0,0 +1,119 @@
+import pytest
+
+
+def names(results, n=10):
+    return [card.name for card, _ in results[:n]]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Arceus VSTAR", "Arceus VSTAR"),
+    ("Arceus V", "Arceus V"),
+    ("Pikachu V", "Pikachu V"),
+    ("Charizard V", "Charizard V"),
+    ("Charizard GX", "Charizard-GX"),
+])
+def test_suffix_tokens_stay_in_the_name(search_index, query, expected):
+    set_codes, numbers, name_query = search_index.parse_query(query)
+    assert set_codes is None
+    assert numbers == set()
+    assert name_query == query.lower()
+    found = names(search_index.search(query), None)
+    # Alle Karten mit genau diesem Namen vor allen anderen
+    exact = found.count(expected)
+    assert exact > 0 and found[:exact] == [expected] * exact
+
+
+@pytest.mark.parametrize("query", ["arceus", "jungle", "fossil", "platinum", "team rocket", "151"])
+def test_set_names_do_not_take_over_name_queries(search_index, query):
+    set_codes, numbers, name_query = search_index.parse_query(query)
+    assert set_codes is None
+    assert name_query == query
+
+
+def test_team_rocket_finds_team_rocket_cards(search_index):
+    assert all(name.startswith("Team Rocket's") for name in names(search_index.search("Team Rocket"), 5))
+
+
+def test_only_digit_tokens_are_collector_numbers(search_index):
+    assert search_index.parse_query("pikachu 25") == (None, {"25"}, "pikachu")
+    assert search_index.parse_query("pikachu v")[1] == set()
+
+
+@pytest.mark.parametrize("query, expected_id", [
+    ("base1 4", "base1-4"),
+    ("base set 4", "base1-4"),
+    ("charizard base set", "base1-4"),
+    ("charzard base set", "base1-4"),
+    ("pikachu jungle", "base2-60"),
+])
+def test_set_filter_when_rest_matches_a_name_in_the_set(search_index, query, expected_id):
+    assert search_index.search(query)[0][0].id == expected_id
+
+
+def test_set_filter_dropped_when_rest_is_not_in_the_set(search_index):
+    # Kein Glurak in Jungle: dann ist "jungle" nur Teil der Namenssuche
+    set_codes, _, name_query = search_index.parse_query("charizard jungle")
+    assert set_codes is None
+    assert name_query == "charizard jungle"
+
+
+def test_pruned_search_recall_against_full_scan(search_index):
+    from search_index import STRONG_SCORE, recall_at_limit, sample_queries
+
+    recall = []
+    for query in sample_queries(search_index, 150, seed=7):
+        full = search_index.search(query, prune=False)
+        pruned = search_index.search(query)
+        assert bool(pruned) == bool(full), query
+        if full:
+            # Bester Treffer immer gleich gut
+            assert pruned[0][1] == full[0][1], query
+        # Starke Treffer fehlen nie, Verluste gibt es nur bei schwachen Teiltreffern und Gleichständen
+        assert recall_at_limit(full, pruned, STRONG_SCORE) == 1.0, query
+        recall.append(recall_at_limit(full, pruned))
+    assert sum(recall) / len(recall) >= 0.95
+
+
+def test_candidate_set_is_capped(search_index):
+    from search_index import MAX_CANDIDATES, normalize_text, sample_queries
+
+    for query in sample_queries(search_index, 50, seed=3):
+        name_ids = search_index.name_candidates(normalize_text(query))
+        assert name_ids is None or len(name_ids) <= MAX_CANDIDATES + len(search_index.tiny_names)
+
+
+def test_fallback_scores_only_the_remaining_names(search_index, monkeypatch):
+    # Zu wenige Treffer im Vorfilter: Vorfilter und Fallback scoren zusammen jeden Namen genau einmal
+    scored = []
+    score_names = search_index._score_names
+
+    def counting(name_query, candidates=None, prune=True, name_ids=None, exclude=None):
+        if name_ids is not None:
+            scored.extend(name_ids)
+        else:
+            skipped = set(exclude or ())
+            scored.extend(i for i in range(len(search_index.names)) if i not in skipped)
+        return score_names(name_query, candidates, prune, name_ids, exclude)
+
+    monkeypatch.setattr(search_index, "_score_names", counting)
+    search_index.search("zuzu")
+    assert sorted(scored) == list(range(len(search_index.names)))
+
+
+def test_short_names_are_always_scored(search_index):
+    # Der kurze Name "N" hat kein gemeinsames N-Gramm mit der Anfrage, WRatio gibt ihm trotzdem 90
+    full = search_index.search("minccino", prune=False)
+    pruned = search_index.search("minccino")
+    assert "N" in {card.name for card, _ in full}
+    assert [score for _, score in pruned] == [score for _, score in full]
+
+
+def test_pruned_search_falls_back_to_full_scan_for_few_matches(search_index):
+    # Unter den vorgefilterten Namen trifft "zuzu" nur 2 Karten, über alle Namen deutlich mehr
+    from search_index import SEARCH_LIMIT
+
+    assert len(search_index._score_names("zuzu")) < SEARCH_LIMIT
+    full = search_index.search("zuzu", prune=False)
+    assert len(full) > 2
+    assert [(card.id, score) for card, score in search_index.search("zuzu")] == \
+        [(card.id, score) for card, score in full]
@@ -0,0 +1,25 @@
+import csv
+import io
+
+from autoscrape.html_cache import HtmlCache
+from conftest import REPO
+from update_cache import NO_PRICE, NOT_CACHED, reparse_cached_prices
+
+
+def test_replay_reports_missing_and_priceless_pages(tmp_path):
+    cache = HtmlCache(tmp_path / "html")
+    # Gültiges HTML, aber keine Produktseite: kein Preis
+    cache.put("https://example.invalid/ohne-preis", (REPO / "website_1.html").read_text(encoding="utf-8"))
+    rows = [{"set": "sv1", "nr": "1"}, {"set": "sv1", "nr": "2"}, {"set": "sv1", "nr": "3"}]
+    urls = ["https://example.invalid/ohne-preis", "https://example.invalid/fehlt", None]
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["set", "nr", "online_price"])
+    unmatched = []
+
+    reparse_cached_prices(rows, urls, writer, unmatched, cache)
+
+    assert [(entry["nr"], entry["reason"], entry["detail"]) for entry in unmatched] == [
+        ("1", "fetch_failed", NO_PRICE),
+        ("2", "fetch_failed", NOT_CACHED),
+    ]
+    assert [row["online_price"] for row in rows] == ["", "", ""]
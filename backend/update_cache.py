@@ -1,14 +1,18 @@
+import argparse
+import asyncio
 import csv
 import json
+import re
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from bs4 import BeautifulSoup
-import requests
-
-from autoscrape.playwrightPy import scrape_with_playwright_sync
-from autoscrape.cardmarket_parser import CardmarketPricePlugin
+from autoscrape.playwrightPy import DEFAULT_RESOURCE_POLICY, ScraperSession, get_sync_session
+from autoscrape.cardmarket_parser import CardmarketPricePlugin, extract_field
+from autoscrape.fetch_pipeline import FETCH_CONCURRENCY, HOST_RATE, fetch_and_parse
+from autoscrape.html_cache import HTML_CACHE_TTL, HtmlCache
+from autoscrape.overview_parser import PAGE_DELAY, iter_overview_pages
+from autoscrape.tiered_fetcher import OVERVIEW_PAGE_MARKERS, PRODUCT_PAGE_MARKERS, TieredFetcher
 
 
 # Globale Pfade
@@ -65,19 +69,19 @@ def save_updated_cards(set_id, cards, base_path: Path = CACHE_PATH):
         json.dump(cards, f, ensure_ascii=False, indent=2)
 
 
-def scrape_overview_prices(set_url_base: str, max_pages: int = 20) -> dict:
+def scrape_overview_prices(set_url_base: str, max_pages: int = 20, cache: HtmlCache = None,
+                           replay: bool = False) -> dict:
     result = {}
     seen = set()
     found = False
-
-    for page in range(1, max_pages + 1):
-        url = f"{set_url_base}&site={page}"
-        if page == 1:
-            print(f"Scraping: {url}")
-
-        html = scrape_with_playwright_sync(url, engine="playwright-stealth", headless=True)
-        soup = BeautifulSoup(html, "html.parser")
-        rows = soup.select('div.table.table-striped.mb-3 div.row.g-0[id^="row"]') or soup.select('div.table.table-striped.mb-3 div.row.g-0[id^="row"]')
+    # Erst Cache, dann einfaches HTTP, nur bei Challenge/fehlendem Inhalt der Browser
+    fetcher = TieredFetcher(get_sync_session("playwright-stealth", True, resource_policy=DEFAULT_RESOURCE_POLICY),
+                            markers=OVERVIEW_PAGE_MARKERS, cache=cache, replay=replay)
+
+    print(f"Scraping: {set_url_base}&site=1")
+    # Seite N+1 wird schon geladen, während Seite N verarbeitet wird
+    for page, rows in iter_overview_pages(set_url_base, fetcher.fetch_sync, max_pages,
+                                          delay=0 if replay else PAGE_DELAY):
         if not rows:
             if page == 1:
                 return None
@@ -85,46 +89,19 @@ def scrape_overview_prices(set_url_base: str, max_pages: int = 20) -> dict:
 
         found = True
         for row in rows:
-            aria_labels = [svg.get("aria-label", "") for svg in row.select("svg[aria-label]")]
-            if "Online Code Card" in aria_labels:
-                continue
-            link = row.select_one('a[href*="/Products/"]')
-            number_div = row.select_one('div.col-md-2')
-            price_div = row.select_one('div.col-price.pe-sm-2')
-            price_rev_div = row.select_one('div.col-price.d-lg-flex')
-
-            if not link or not number_div:
-                continue
-
-            number = number_div.text.strip().lstrip("0")
-            if not number.isdigit():
-                continue
-
-            name = link.text.strip()
-            url = "https://www.cardmarket.com" + link["href"]
-            try:
-                price = float(price_div.text.replace("€", "").replace(",", ".").strip())
-            except Exception:
-                price = None
-            try:
-                price_rev = float(price_rev_div.text.replace("€", "").replace(",", ".").strip())
-            except Exception:
-                price_rev = None
-
-            promo = "Promo" in aria_labels
-            key = f"{number}-promo" if promo else number
+            key = f"{row.number}-promo" if row.promo else row.number
             if key in seen:
                 continue
             seen.add(key)
             result[key] = {
-                "number": number,
-                "url": url,
-                "price": price,
-                "price_rev": price_rev,
-                "promo": promo,
-                "name": name
+                "number": row.number,
+                "url": row.url,
+                "price": row.price,
+                "price_rev": row.price_rev,
+                "promo": row.promo,
+                "name": row.name
             }
-        time.sleep(1)
+    print(f"Übersicht {set_url_base}: {fetcher.summary()}")
     if not found:
         return None
     return result
@@ -198,7 +175,8 @@ def get_all_aliases(set_code: str):
 
 
 def find_cache_json(set_code: str, notes):
-    probable_aliases = get_all_aliases(set_code)
+    # Kopie, sonst landet "tg" dauerhaft in der gemeinsamen Alias-Liste des Sets
+    probable_aliases = list(get_all_aliases(set_code))
     if "TG" in notes:
         probable_aliases.append("tg")
     for alias in probable_aliases:
@@ -208,17 +186,104 @@ def find_cache_json(set_code: str, notes):
     return None
 
 
-def find_card(row, cards_list):
-    for card in cards_list:
-        if str(card.get("number", "")).lstrip("0") == str(row["nr"]).lstrip("0"):
-            # if card.get("set") and row["set"].lower() in card.get("set", "").lower():
-            #     if card.get("name") == row["pokemon"]:
-            print(f"Match found for {row}: {card.get('name')}")
+_NUMBER_PARTS = re.compile(r"^([A-Za-z]*)0*(\d+)([A-Za-z]*)$")
+
+
+def normalize_number(number) -> str:
+    """Sammlernummer ohne führende Nullen, wie bisher beim Vergleich ("007" -> "7", "TG01" bleibt "TG01")."""
+    return str(number).strip().lstrip("0")
+
+
+def number_variants(number) -> list:
+    """
+    Weitere Schlüssel für Nummern mit Präfix/Suffix: "TG01" -> ["tg1", "1"], "SV001" -> ["sv1", "1"],
+    "2a" -> ["2a"]. Damit passen CSV-Zeilen mit "TG1" oder nur "1" in TG-/Promo-Sets.
+    """
+    match = _NUMBER_PARTS.match(str(number).strip())
+    if not match:
+        return [normalize_number(number).lower()]
+    prefix, digits, suffix = match.groups()
+    variants = [f"{prefix.lower()}{digits}{suffix.lower()}"]
+    if prefix:
+        variants.append(f"{digits}{suffix.lower()}")
+    return variants
+
+
+def build_card_index(cards) -> dict:
+    """
+    Nummer -> Karte für eine Set-Datei. Exakte (normalisierte) Nummern haben Vorrang vor den Varianten,
+    bei Doppelten gewinnt wie bisher die erste Karte der Liste.
+    """
+    index = {}
+    for card in cards:
+        index.setdefault(normalize_number(card.get("number", "")), card)
+    for card in cards:
+        for key in number_variants(card.get("number", "")):
+            index.setdefault(key, card)
+    return index
+
+
+def load_card_index(cache_json_path: Path, indexes: dict) -> dict:
+    """Index der Set-Datei, pro Datei nur einmal gelesen und aufgebaut."""
+    index = indexes.get(cache_json_path)
+    if index is None:
+        with cache_json_path.open("r", encoding="utf-8") as f:
+            index = indexes[cache_json_path] = build_card_index(json.load(f))
+    return index
+
+
+def find_card(row, index):
+    number = row["nr"]
+    # Nur Schlüssel mit Präfix: "TG1" darf nicht auf die normale Karte 1 fallen
+    for key in (normalize_number(number), number_variants(number)[0]):
+        card = index.get(key)
+        if card is not None:
             return card
-    print(f"Warning: card not found for {row}")
     return None
 
 
+def add_unmatched(unmatched, row, reason, detail=None):
+    unmatched.append({
+        "set": row.get("set"),
+        "nr": row.get("nr"),
+        "lang": row.get("lang"),
+        "pokemon": row.get("pokemon"),
+        "reason": reason,
+        "detail": detail,
+    })
+
+
+# Gründe im Bericht über nicht zugeordnete Zeilen
+UNMATCHED_REASONS = {
+    "no_set_cache": "Kein Cache-JSON für das Set",
+    "card_not_found": "Nummer nicht im Set-Cache",
+    "no_url": "Karte ohne Cardmarket-URL",
+    "fetch_failed": "Seite nicht geladen/geparst",
+}
+# Details für fetch_failed ohne Ausnahme
+NO_PRICE = "Leere Seite oder kein Preis gefunden"
+NOT_CACHED = "Nicht im HTML-Cache"
+
+
+def print_unmatched_report(unmatched, total_rows):
+    """Fasst die nicht zugeordneten Zeilen nach Grund und Set zusammen (statt einer Meldung pro Zeile)."""
+    if not unmatched:
+        print(f"Alle {total_rows} Zeilen zugeordnet")
+        return
+    print(f"Nicht zugeordnet: {len(unmatched)} von {total_rows} Zeilen")
+    for reason, label in UNMATCHED_REASONS.items():
+        entries = [entry for entry in unmatched if entry["reason"] == reason]
+        if not entries:
+            continue
+        by_set = {}
+        for entry in entries:
+            by_set.setdefault(entry["set"], []).append(entry["nr"])
+        print(f"  {label}: {len(entries)} Zeilen in {len(by_set)} Sets")
+        for set_code, numbers in sorted(by_set.items(), key=lambda item: -len(item[1])):
+            print(f"    {set_code}: {', '.join(str(number) for number in numbers[:20])}"
+                  f"{f' (+{len(numbers) - 20})' if len(numbers) > 20 else ''}")
+
+
 def build_cardmarket_url(base_url: str, lang_code: str, isreverse: bool) -> str:
     lang_param = language_map.get(lang_code.lower(), 3)  # default de=3
     if isreverse:
@@ -229,13 +294,131 @@ def build_cardmarket_url(base_url: str, lang_code: str, isreverse: bool) -> str:
         return base_url + f"?language={lang_param}"
 
 
-def update_prices_in_csv():
-    plugin = CardmarketPricePlugin()  # dein Cardmarket-Parser
+def plan_price_updates(reader, unmatched):
+    """
+    Ordnet jeder CSV-Zeile ihre Cardmarket-URL zu (None, wenn es keine gibt).
+    Zeilen ohne Cache-JSON für ihr Set fallen wie bisher ganz weg. Liefert (Zeilen, URLs, gelesene Zeilen);
+    alles, was nicht zugeordnet werden konnte, landet in `unmatched` (siehe add_unmatched).
+    """
+    rows, urls = [], []
+    indexes = {}
+    total = 0
+
+    for row in reader:
+        total += 1
+        notes = []
+        if row.get("note1"):
+            notes.append(row["note1"])
+        if row.get("note2"):
+            notes.append(row["note2"])
+        set_code = row["set"]
+        cache_json_path = find_cache_json(set_code, notes)
+        if cache_json_path is None:
+            add_unmatched(unmatched, row, "no_set_cache")
+            continue
+        match = find_card(row, load_card_index(cache_json_path, indexes))
+        url = None
+        if match is None:
+            add_unmatched(unmatched, row, "card_not_found", cache_json_path.name)
+        elif match.get("cardmarket", {}).get("url"):
+            lang_code = row.get("lang", "de")
+            isreverse = "Reverse" in notes
+            url = build_cardmarket_url(match["cardmarket"]["url"], lang_code, isreverse)
+        else:
+            add_unmatched(unmatched, row, "no_url", match.get("id"))
+        rows.append(row)
+        urls.append(url)
+    return rows, urls, total
+
+
+def unique_urls(urls):
+    """Die URLs ohne None und Wiederholungen, in der Reihenfolge ihres ersten Auftretens."""
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+async def refresh_prices(rows, urls, writer, unmatched, concurrency=FETCH_CONCURRENCY, rate=HOST_RATE,
+                         human_sleep_scale=1.0, use_http=True, cache=None, replay=False):
+    """Lädt alle Preise parallel (max. `concurrency` Seiten, `rate` Anfragen/s pro Host) und schreibt in Eingabereihenfolge."""
+    # Erst einfaches HTTP mit Verbindungspool, nur bei Challenge/fehlendem Inhalt ein echter Browser
+    # (Playwright, ein Kontext pro parallel geladener Seite, startet erst beim ersten Bedarf).
+    # Bilder, Fonts, CSS und Tracker werden gar nicht erst geladen, wir lesen nur das HTML.
+    session = ScraperSession(engine="playwright-stealth", headless=True, pool_size=concurrency,
+                             resource_policy=DEFAULT_RESOURCE_POLICY, human_sleep_scale=human_sleep_scale)
+    fetcher = TieredFetcher(session, markers=PRODUCT_PAGE_MARKERS, use_http=use_http, pool_size=concurrency,
+                            cache=cache, replay=replay)
+    try:
+        # Jede URL nur einmal laden; Seiten aus dem HTML-Cache umgehen Parallelitäts- und Ratenlimit
+        results = fetch_and_parse(unique_urls(urls), fetcher.fetch_live, extract_field,
+                                  concurrency=concurrency, rate=rate, cached=fetcher.cached)
+        prices = {}
+        try:
+            for row, url in zip(rows, urls):
+                row["online_price"] = ""
+                if url:
+                    if url not in prices:
+                        # Ergebnisse kommen in der Reihenfolge des ersten Auftretens, also ist das genau diese URL
+                        result = await results.__anext__()
+                        if result.error is not None:
+                            print(f"⚠️ Fehler beim Verarbeiten von URL {url}: {result.error}")
+                        prices[url] = result
+                    result = prices[url]
+                    if result.error is not None:
+                        add_unmatched(unmatched, row, "fetch_failed", str(result.error))
+                    elif result.value is None:
+                        # Leere Seite oder Seite ohne Preis: kein Fehler beim Abruf, aber auch kein Wert
+                        add_unmatched(unmatched, row, "fetch_failed", NO_PRICE)
+                    else:
+                        row["online_price"] = result.value
+                writer.writerow(row)
+        finally:
+            await results.aclose()
+    finally:
+        await session.close()
+    print(f"Abruf: {fetcher.summary()}")
+    if cache is not None:
+        print(f"HTML-Cache: {cache.stats()}")
+    stats = session.stats()
+    if stats["pages"]:
+        print(f"Browser: {stats['pages']} Seiten, {stats['bytes_per_page'] / 1024:.0f} KiB/Seite, "
+              f"{stats['seconds_per_page']:.2f} s/Seite, {stats['requests_blocked']} Anfragen blockiert")
+
+
+def reparse_cached_prices(rows, urls, writer, unmatched, cache):
+    """Replay ohne Netz: alle Seiten aus dem HTML-Cache, gebündelt auf alle Kerne verteilt geparst."""
+    fetcher = TieredFetcher(None, cache=cache, replay=True)
+    missing = set()
+
+    def pages():
+        for url in unique_urls(urls):
+            html = fetcher.cached(url)
+            if not html:
+                missing.add(url)
+            yield html
+
+    # parse_many holt die Seiten vor ihren Ergebnissen, `missing` ist also beim Auswerten schon gefüllt
+    values = CardmarketPricePlugin().parse_many(pages())
+    prices = {}
+    for row, url in zip(rows, urls):
+        row["online_price"] = ""
+        if url:
+            if url not in prices:
+                prices[url] = next(values).get("avg_7_days")
+            if url in missing:
+                add_unmatched(unmatched, row, "fetch_failed", NOT_CACHED)
+            elif prices[url] is None:
+                add_unmatched(unmatched, row, "fetch_failed", NO_PRICE)
+            else:
+                row["online_price"] = prices[url]
+        writer.writerow(row)
+    print(f"Abruf: {fetcher.summary()}")
+    print(f"HTML-Cache: {cache.stats()}")
+
+
+def update_prices_in_csv(concurrency=FETCH_CONCURRENCY, rate=HOST_RATE, human_sleep_scale=1.0, use_http=True,
+                         cache=None, replay=False, unmatched_report=None):
     full_collection_path = ALBUM_PATH / "fullcollection.csv"
     save_collection_path = ALBUM_PATH / "fullcollection_with_prices.csv"
-    set_not_found = []
-    no_url_found = []
-
+    unmatched = []
 
     with full_collection_path.open("r", encoding="utf-8", newline="") as csvfile, \
             save_collection_path.open("w", encoding="utf-8", newline="") as outcsv:
@@ -245,65 +428,48 @@ def update_prices_in_csv():
         writer = csv.DictWriter(outcsv, fieldnames=fieldnames)
         writer.writeheader()
 
-        cache_cache = {}
-
-        for row in reader:
-            notes = []
-            if row.get("note1"):
-                notes.append(row["note1"])
-            if row.get("note2"):
-                notes.append(row["note2"])
-            set_code = row["set"]
-            cache_json_path = find_cache_json(set_code, notes)
-            if cache_json_path is None:
-                print(f"⚠️ Kein Cache-JSON für Set '{set_code}' gefunden. Zeile wird übersprungen.")
-                set_not_found.append(set_code)
-                continue
-            if cache_json_path not in cache_cache:
-                with cache_json_path.open("r", encoding="utf-8") as f:
-                    cache_cache[cache_json_path] = json.load(f)
-            cards = cache_cache[cache_json_path]
-            match = find_card(row, cards)
-            if match and match.get("cardmarket", {}).get("url"):
-                url = match["cardmarket"]["url"]
-                try:
-                    lang_code = row.get("lang", "de")
-                    isreverse = False
-                    if "Reverse" in notes:
-                        isreverse = True
-                    url = build_cardmarket_url(url, lang_code, isreverse)
-                    # Lade die Seite mit Playwright (echter Browser)
-                    html = scrape_with_playwright_sync(url, engine="playwright-stealth",headless=True)
-                    # Parsen mit dem Cardmarket-Parser
-                    fields = plugin.parse(html)
-
-                    price = None
-                    for f in fields:
-                        # Preisdaten hier anpassbar (avg, low, trend, ...)
-                        if "avg_7_days" in f.name.lower():
-                            price = f.value
-
-                    row["online_price"] = price
-
-                except Exception as e:
-                    row["online_price"] = ""
-                    print(f"⚠️ Fehler beim Verarbeiten von URL {url}: {e}")
-                    no_url_found.append()
-            else:
-                row["online_price"] = ""
-                print(f"⚠️  Keine URL in Cache für {row}")
-                no_url_found.append(f"{set_code} - {row['nr']}")
-            writer.writerow(row)
-    set(set_not_found)
-    set(no_url_found)
-    print(f"Sets not mapped yet: {set_not_found}")
-    print(f"Cards without URL or price: {no_url_found}")
-    
-            
-update_prices_in_csv()
-# if __name__ == "__main__":
-#     set_mapping = load_set_mapping("set_mapping.json")
-#     # update_single_set_from_overview("sv3pt5", set_mapping["sv3pt5"])
-
-#     for set_id, mapped_set_name in set_mapping.items():
-#         update_single_set_from_overview(set_id, mapped_set_name)
+        rows, urls, total = plan_price_updates(reader, unmatched)
+        start = time.perf_counter()
+        if replay:
+            reparse_cached_prices(rows, urls, writer, unmatched, cache)
+        else:
+            asyncio.run(refresh_prices(rows, urls, writer, unmatched, concurrency, rate, human_sleep_scale,
+                                       use_http, cache, replay))
+        rows_with_url = sum(1 for url in urls if url)
+        unique = len(unique_urls(urls))
+        print(f"{unique} Seiten für {rows_with_url} Zeilen in {time.perf_counter() - start:.1f} s geladen "
+              f"(eindeutige Abrufe: {unique / rows_with_url if rows_with_url else 0:.0%}, "
+              f"{rows_with_url - unique} Doppelte gespart)")
+    print_unmatched_report(unmatched, total)
+    if unmatched_report is not None:
+        with Path(unmatched_report).open("w", encoding="utf-8") as f:
+            json.dump(unmatched, f, ensure_ascii=False, indent=2)
+        print(f"Bericht: {unmatched_report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preise der Sammlung (fullcollection.csv) von Cardmarket aktualisieren")
+    parser.add_argument("-c", "--concurrency", type=int, default=FETCH_CONCURRENCY, help="Seiten gleichzeitig laden")
+    parser.add_argument("-r", "--rate", type=float, default=HOST_RATE, help="Anfragen pro Sekunde pro Host")
+    parser.add_argument("--human-sleep-scale", type=float, default=1.0,
+                        help="Pausen der Mensch-Simulation skalieren (0 = keine, für vertrauenswürdige Läufe)")
+    parser.add_argument("--browser-only", action="store_true", help="Ohne HTTP-Stufe direkt mit Playwright laden")
+    parser.add_argument("--replay", action="store_true",
+                        help="Nur aus dem HTML-Cache (cache/html) lesen, nichts aus dem Netz laden")
+    parser.add_argument("--cache-ttl", type=float, default=HTML_CACHE_TTL / 3600,
+                        help="Gültigkeit gecachter Seiten in Stunden")
+    parser.add_argument("--no-cache", action="store_true", help="HTML-Cache weder lesen noch schreiben")
+    parser.add_argument("--unmatched-report", metavar="JSON",
+                        help="Nicht zugeordnete Zeilen (Grund, Set, Nummer, Sprache) als JSON speichern")
+    args = parser.parse_args()
+    if args.replay and args.no_cache:
+        parser.error("--replay braucht den HTML-Cache")
+    html_cache = None if args.no_cache else HtmlCache(ttl=args.cache_ttl * 3600)
+    update_prices_in_csv(args.concurrency, args.rate, args.human_sleep_scale, not args.browser_only,
+                         html_cache, args.replay, args.unmatched_report)
+
+    # set_mapping = load_set_mapping("set_mapping.json")
+    # # update_single_set_from_overview("sv3pt5", set_mapping["sv3pt5"])
+
+    # for set_id, mapped_set_name in set_mapping.items():
+    #     update_single_set_from_overview(set_id, mapped_set_name)